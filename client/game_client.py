@@ -14,6 +14,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from shared.models.player import Player
 from shared.models.game import Game
+from shared.game_logic.state_manager import GameState
+from shared.game_logic.bot_strategy import get_strategy
 from shared.network.message import Message, MessageType, ActionType
 from shared.network.p2p_manager import P2PManager
 from server.matchmaking import MatchmakingService
@@ -22,6 +24,9 @@ from client.player_data import get_player_balance, update_player_balance, check_
 import shared.config as config
 import client.ui.menu as menu
 
+# Tempo que um bot "pensa" antes de cada jogada, em segundos
+BOT_THINK_TIME = 0.5
+
 
 class BlackjackClient:
     def __init__(self):
@@ -66,6 +71,8 @@ class BlackjackClient:
         self.cursor_timer = 0
         self.p2p_manager = None
         self.game = None
+        self.bot_turn = None  # (id do bot, cartas na mão) da jogada sendo esperada
+        self.bot_act_at = 0  # Quando o bot da vez pode jogar
         self.game_state = None
         self.host_mode = False
         self.game_id = None  # Inicializar game_id
@@ -297,6 +304,9 @@ class BlackjackClient:
         if self.game_state and "messages" in self.game_state:
             self.messages = self.game_state["messages"]
 
+        # Enviar aos jogadores, de uma vez, o estado marcado durante este tick
+        self.room.flush_broadcast()
+
     def render_game(self):
         """Renderizar a tela do jogo"""
         if not self.game_state:
@@ -369,10 +379,6 @@ class BlackjackClient:
         # Renderizar cartas e informações de cada jogador
         player_count = len(self.game_state["players"])
         
-        # Identificar o jogador humano
-        human_player_index = next((i for i, p in enumerate(self.game_state["players"]) 
-                                 if not p["name"].startswith("Bot")), 0)
-        
         # Definir posições dos jogadores - mais espaço para evitar sobreposições
         # Jogador humano agora está mais acima para evitar sobreposição com os controles
         if player_count == 2:
@@ -732,16 +738,17 @@ class BlackjackClient:
             return
             
         # Verificar se o jogador foi eliminado (saldo <= 0)
-        human_player = next((p for p in self.game.state_manager.players if p.player_id == self.player.player_id), None)
+        human_player = self.game.state_manager.get_player(self.player.player_id)
         if human_player:
             eliminated, new_balance = check_player_eliminated(human_player.name, human_player.balance)
             if eliminated:
                 self.game.messages.append(f"{human_player.name} foi eliminado! Saldo resetado para 100.")
-                human_player.balance = new_balance
+                self.game.set_player_balance(human_player.player_id, new_balance)
                 self.player_balance = new_balance
                 update_player_balance(human_player.name, new_balance)
 
         # Resetar o jogo para uma nova rodada
+        self.bot_turn = None
         success, message = self.game.start_new_round()
         if success:
             self.game.messages.append("Nova rodada iniciada!")
@@ -778,13 +785,11 @@ class BlackjackClient:
         """Aumentar o valor da aposta"""
         if self.player and self.player.balance > self.bet_amount:
             self.bet_amount = min(self.bet_amount + 10, self.player.balance)
-            self.room.broadcast_game_state()
 
     def decrease_bet(self):
         """Diminuir o valor da aposta"""
         if self.bet_amount > 10:  # Valor mínimo de aposta
             self.bet_amount = max(self.bet_amount - 10, 10)
-            self.room.broadcast_game_state()
 
     def create_bot(self, name, strategy="default"):
         """Criar um bot com a estratégia especificada
@@ -792,9 +797,12 @@ class BlackjackClient:
         - default: Para em 17+, pede em 16-
         - aggressive: Para em 18+, pede em 17-
         - conservative: Para em 15+, pede em 14-
+        - expected_value: Pede carta quando o valor esperado exato é maior
         """
         bot_player = Player(name, 1000, str(uuid.uuid4()))
         bot_player.strategy = strategy
+        # Criada uma vez por bot, para reaproveitar o cache do valor esperado
+        bot_player.bot_strategy = get_strategy(strategy)
         return bot_player
 
     def start_single_player(self, num_bots=1):
@@ -864,8 +872,8 @@ class BlackjackClient:
         # Lógica de jogo do bot
         if self.game_state["state"] == "PLAYER_TURN":
             # Verificar se o jogador humano estourou
-            human_player = next((p for p in self.game_state["players"] if not p["name"].startswith("Bot")), None)
-            if human_player and human_player["is_busted"]:
+            human_player = self.game.state_manager.get_player(self.player.player_id)
+            if human_player and human_player.hand.is_busted:
                 # Se o jogador humano estourou, o bot para
                 success, message = self.game.stand(current_player["id"])
                 if success:
@@ -874,24 +882,24 @@ class BlackjackClient:
                 self.room.broadcast_game_state()
                 return
 
-            # Esperar um pouco para simular "pensamento"
-            time.sleep(0.5)  # Reduzido para manter o jogo fluido com múltiplos bots
+            # Esperar um pouco para simular "pensamento", sem travar o quadro:
+            # a jogada só acontece num update() depois do prazo
+            bot_player = self.game.state_manager.get_player(current_player["id"])
+            turn = (current_player["id"], len(bot_player.hand.cards) if bot_player else 0)
+            if turn != self.bot_turn:
+                self.bot_turn = turn
+                self.bot_act_at = time.time() + BOT_THINK_TIME
+            if time.time() < self.bot_act_at:
+                return
 
             # Encontrar a estratégia do bot atual
-            hand_value = current_player["hand_value"]
-            bot_player = next((p for p in self.game.state_manager.players if p.player_id == current_player["id"]), None)
-            
             if bot_player:
-                strategy = getattr(bot_player, "strategy", "default")
+                strategy = getattr(bot_player, "bot_strategy", None)
+                if strategy is None:
+                    strategy = bot_player.bot_strategy = get_strategy(getattr(bot_player, "strategy", "default"))
                 
                 # Aplicar estratégia
-                limit = 17  # Padrão
-                if strategy == "aggressive":
-                    limit = 18
-                elif strategy == "conservative":
-                    limit = 15
-                
-                if hand_value < limit:
+                if bot_player.can_hit() and strategy.should_hit(bot_player, self.game):
                     success, message = self.game.hit(current_player["id"])
                     if success:
                         self.game.messages.append(f"{current_player['name']} pediu carta")
@@ -905,77 +913,32 @@ class BlackjackClient:
             self.room.broadcast_game_state()
 
     def check_winner(self):
-        """Verificar o vencedor da rodada"""
-        if not self.game_state:
+        """Encerrar a rodada quando todos os outros jogadores estouraram
+
+        O jogador da vez é então o último a jogar e para. O acerto das
+        apostas fica com Game._end_round, o mesmo usado pelo simulador:
+        o pote é dividido entre os vencedores empatados.
+        """
+        if not self.game or self.game.state_manager.state != GameState.PLAYER_TURN:
             return
 
-        players = self.game_state["players"]
-        
-        # Separar jogadores humanos e bots
-        human_player = next((p for p in players if not p["name"].startswith("Bot")), None)
-        if not human_player:
+        state_manager = self.game.state_manager
+        current_player = state_manager.get_current_player()
+        if not current_player:
             return
-            
-        active_players = [p for p in players if not p["is_busted"]]
-        
-        # Se todos estouraram, não há vencedor
-        if not active_players:
-            self.game.messages.append("Todos estouraram! Ninguém ganha.")
-            self.game_state["state"] = "GAME_OVER"
+        if any(not p.hand.is_busted for p in state_manager.players if p is not current_player):
             return
-            
-        # Se apenas um jogador não estourou, ele é o vencedor
-        if len(active_players) == 1:
-            winner = active_players[0]
-            self.game.messages.append(f"{winner['name']} venceu! (Único jogador não estourado)")
-            
-            # Processar resultado (apenas para jogadores humanos)
-            if winner["name"] == self.player.name:
-                old_balance = self.player.balance
-                # Calcular o prêmio (soma de todas as apostas)
-                total_pot = sum(p["current_bet"] for p in players)
-                # Atualizar o saldo (já incluído no objeto player)
-                new_balance = self.player.balance
-                print(f"Jogador {self.player.name} venceu! Saldo atualizado: {old_balance} -> {new_balance} (ganhou {total_pot})")
-                # Salvar no arquivo
-                update_player_balance(self.player.name, new_balance)
-                self.player_balance = new_balance
-                
-            self.game_state["state"] = "GAME_OVER"
+
+        self.game.stand(current_player.player_id)
+        if state_manager.state != GameState.GAME_OVER:
             return
-            
-        # Se múltiplos jogadores não estouraram, encontre o maior valor
-        max_value = max(p["hand_value"] for p in active_players)
-        winners = [p for p in active_players if p["hand_value"] == max_value]
-        
-        # Anunciar vencedores
-        if len(winners) == 1:
-            self.game.messages.append(f"{winners[0]['name']} venceu com {max_value} pontos!")
-            
-            # Processar resultado (apenas para jogadores humanos)
-            if winners[0]["name"] == self.player.name:
-                old_balance = self.player.balance
-                # Atualizar o saldo (já incluído no objeto player)
-                new_balance = self.player.balance
-                print(f"Jogador {self.player.name} venceu! Saldo atualizado: {old_balance} -> {new_balance}")
-                # Salvar no arquivo
-                update_player_balance(self.player.name, new_balance)
-                self.player_balance = new_balance
-        else:
-            winner_names = ", ".join(w["name"] for w in winners)
-            self.game.messages.append(f"Empate entre {winner_names} com {max_value} pontos!")
-            
-            # Verificar se o jogador humano está entre os vencedores
-            if any(w["name"] == self.player.name for w in winners):
-                old_balance = self.player.balance
-                # Atualizar o saldo (já incluído no objeto player)
-                new_balance = self.player.balance
-                print(f"Jogador {self.player.name} empatou! Saldo atualizado: {old_balance} -> {new_balance}")
-                # Salvar no arquivo
-                update_player_balance(self.player.name, new_balance)
-                self.player_balance = new_balance
-            
-        self.game_state["state"] = "GAME_OVER"
+        self.game_state = self.game.get_game_state()
+
+        # Salvar no arquivo o saldo já acertado pelo jogo
+        human_player = state_manager.get_player(self.player.player_id)
+        if human_player:
+            self.player_balance = human_player.balance
+            update_player_balance(human_player.name, human_player.balance)
         self.room.broadcast_game_state()
 
     def render_bot_selection(self):
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Benchmark do servidor de lobby.
+Abre muitas conexões simultâneas e mede requisições por segundo e latência.
+Por padrão cada requisição usa uma conexão nova (protocolo antigo); com
+--persistent cada conexão envia requisições em quadros, --pipeline por vez.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+
+# Adicionar o diretório raiz ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.lobby_server import LobbyServer
+from shared.network.framing import FRAME_HEADER, encode_frame
+
+
+def run_server(host, port, backlog, max_connections):
+    """Executa o servidor de lobby (processo separado)"""
+    LobbyServer(host=host, port=port, backlog=backlog, max_connections=max_connections).start()
+
+
+async def request(host, port, payload):
+    """Envia uma requisição e devolve a resposta decodificada"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(payload)
+        return json.loads(await reader.read())
+    finally:
+        writer.close()
+
+
+async def worker(host, port, payload, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await request(host, port, payload)
+            if response.get("status") != "success":
+                errors.append(response.get("message"))
+                continue
+        except (OSError, ValueError) as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def persistent_worker(host, port, payload, pipeline, deadline, latencies, errors):
+    """Envia lotes de requisições numa única conexão e mede cada lote"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        errors.append(str(e))
+        return
+    request = json.loads(payload)
+    batch = b"".join(
+        encode_frame(json.dumps(dict(request, id=i)).encode('utf-8')) for i in range(pipeline)
+    )
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(batch)
+            for _ in range(pipeline):
+                (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                response = json.loads(await reader.readexactly(length))
+                if response.get("status") != "success":
+                    errors.append(response.get("message"))
+                    continue
+                latencies.append(time.perf_counter() - started)
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        errors.append(str(e))
+    finally:
+        writer.close()
+
+
+def run_clients(host, port, payload, concurrency, duration, pipeline, results):
+    """Executa clientes concorrentes por um tempo e devolve latências e erros (processo separado)"""
+    async def main():
+        deadline = time.perf_counter() + duration
+        latencies = []
+        errors = []
+        if pipeline:
+            workers = (
+                persistent_worker(host, port, payload, pipeline, deadline, latencies, errors)
+                for _ in range(concurrency)
+            )
+        else:
+            workers = (worker(host, port, payload, deadline, latencies, errors) for _ in range(concurrency))
+        await asyncio.gather(*workers)
+        return latencies, errors
+
+    results.put(asyncio.run(main()))
+
+
+def wait_for_server(host, port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            asyncio.run(request(host, port, json.dumps({"command": "LIST_ROOMS"}).encode('utf-8')))
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do servidor de lobby")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço do servidor (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5099, help="Porta do servidor (padrão: 5099)")
+    parser.add_argument("--external", action="store_true",
+                        help="Usar um servidor já em execução em vez de iniciar um")
+    parser.add_argument("--command", default="LIST_ROOMS", help="Comando enviado (padrão: LIST_ROOMS)")
+    parser.add_argument("--rooms", type=int, default=10, help="Salas criadas antes do teste (padrão: 10)")
+    parser.add_argument("--concurrency", type=int, default=200,
+                        help="Conexões simultâneas por processo cliente (padrão: 200)")
+    parser.add_argument("--processes", type=int, default=1, help="Processos clientes (padrão: 1)")
+    parser.add_argument("--persistent", action="store_true",
+                        help="Usar conexões persistentes em vez de uma conexão por requisição")
+    parser.add_argument("--pipeline", type=int, default=1,
+                        help="Requisições enviadas de uma vez em cada conexão persistente (padrão: 1)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Duração em segundos (padrão: 5)")
+    parser.add_argument("--backlog", type=int, default=1024, help="Backlog do servidor iniciado (padrão: 1024)")
+    parser.add_argument("--max-connections", type=int, default=1024,
+                        help="Conexões simultâneas do servidor iniciado (padrão: 1024)")
+    args = parser.parse_args()
+
+    server = None
+    if not args.external:
+        server = multiprocessing.Process(
+            target=run_server, args=(args.host, args.port, args.backlog, args.max_connections), daemon=True
+        )
+        server.start()
+    if not wait_for_server(args.host, args.port):
+        print("Servidor de lobby não respondeu")
+        return 1
+
+    # Popular o lobby
+    for i in range(args.rooms):
+        payload = json.dumps({"command": "CREATE_ROOM", "host_name": f"bench{i}", "host_port": 5555})
+        asyncio.run(request(args.host, args.port, payload.encode('utf-8')))
+
+    payload = json.dumps({"command": args.command}).encode('utf-8')
+    results = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(
+            target=run_clients,
+            args=(args.host, args.port, payload, args.concurrency, args.duration,
+                  args.pipeline if args.persistent else 0, results)
+        )
+        for _ in range(args.processes)
+    ]
+    for client in clients:
+        client.start()
+    latencies = []
+    errors = []
+    for _ in clients:
+        process_latencies, process_errors = results.get()
+        latencies.extend(process_latencies)
+        errors.extend(process_errors)
+    for client in clients:
+        client.join()
+    if server is not None:
+        server.terminate()
+
+    latencies.sort()
+    mode = f"persistente, {args.pipeline} por vez" if args.persistent else "uma conexão por requisição"
+    print(f"Comando: {args.command} | salas: {args.rooms} | "
+          f"conexões simultâneas: {args.concurrency * args.processes} | {mode}")
+    print(f"Requisições: {len(latencies)} em {args.duration:.1f}s "
+          f"({len(latencies) / args.duration:.0f} req/s), erros: {len(errors)}")
+    if latencies:
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+        print(f"Latência: p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+    if errors:
+        print(f"Primeiro erro: {errors[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
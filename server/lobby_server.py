@@ -1,97 +1,299 @@
-import socket
+import asyncio
+import bisect
 import json
-import threading
 import time
 import random
 import string
 import argparse
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.network.framing import FrameDecoder, FrameTooLargeError, encode_frame
+
+# Conexões pendentes que o socket de escuta aceita antes de recusar
+DEFAULT_BACKLOG = 1024
+# Conexões atendidas ao mesmo tempo; as demais recebem "servidor ocupado"
+MAX_CONNECTIONS = 1024
+# Tempo máximo para o cliente enviar a requisição, em segundos
+REQUEST_TIMEOUT = 5.0
+# Tempo que uma conexão persistente pode ficar sem requisições
+IDLE_TIMEOUT = 60.0
+# Tamanho máximo de uma requisição
+MAX_REQUEST_SIZE = 64 * 1024
+# Tamanho máximo de uma resposta em quadro; listas maiores precisam de paginação
+MAX_RESPONSE_SIZE = 1024 * 1024
+# Salas por página de LIST_ROOMS quando o cliente pede paginação
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Filtros aceitos por LIST_ROOMS e o tipo de cada valor
+ROOM_FILTERS = {"has_password": bool, "name": str, "max_players": int}
+
+BUSY_RESPONSE = {"status": "error", "message": "Servidor ocupado, tente novamente"}
+INVALID_JSON_RESPONSE = {"status": "error", "message": "Formato JSON inválido"}
+INTERNAL_ERROR_RESPONSE = {"status": "error", "message": "Erro interno do servidor"}
+RESPONSE_TOO_LARGE_RESPONSE = {"status": "error", "message": "Resposta grande demais, use limit e cursor"}
+
+
+class _LobbyProtocol(asyncio.Protocol):
+    """Uma conexão de cliente.
+
+    O primeiro byte decide o protocolo. "{" é o protocolo antigo: uma
+    requisição JSON, uma resposta e a conexão é fechada. Qualquer outro é
+    uma conexão persistente de quadros com prefixo de tamanho
+    (shared.network.framing): cada requisição traz um "id" que volta na
+    resposta, e o cliente pode enviar várias antes de ler as respostas.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.client_address = None
+        self.buffer = b""
+        self.decoder = None  # FrameDecoder das conexões persistentes
+        self.timeout = None
+        self.timeout_limit = server.request_timeout
+        self.last_activity = 0
+        self.counted = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.client_address = transport.get_extra_info("peername")
+        server = self.server
+        # Acima do limite, a conexão só recebe "servidor ocupado"
+        if server.active_connections < server.max_connections:
+            server.active_connections += 1
+            self.counted = True
+        self.last_activity = server.loop.time()
+        self.timeout = server.loop.call_later(self.timeout_limit, self._check_timeout)
+
+    def _check_timeout(self):
+        """Fechar a conexão se ela ficou tempo demais sem requisições"""
+        remaining = self.last_activity + self.timeout_limit - self.server.loop.time()
+        if remaining > 0:
+            self.timeout = self.server.loop.call_later(remaining, self._check_timeout)
+            return
+        self.timeout = None
+        self.transport.abort()
+
+    def data_received(self, data):
+        if self.transport.is_closing():
+            return
+        if self.decoder is None and not self.buffer and data.lstrip()[:1] not in (b"{", b""):
+            self.decoder = FrameDecoder(MAX_REQUEST_SIZE)
+            self.timeout_limit = self.server.idle_timeout
+        if self.decoder is not None:
+            self._frames_received(data)
+            return
+
+        if not self.counted:
+            # Responder só depois de receber a requisição: fechar antes faria
+            # o cliente receber um reset no lugar da resposta
+            self._respond(json.dumps(BUSY_RESPONSE).encode('utf-8'))
+            return
+        self.buffer += data
+        try:
+            request = json.loads(self.buffer)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # A requisição pode ter chegado em mais de um pedaço
+            if len(self.buffer) <= MAX_REQUEST_SIZE and _incomplete(e, self.buffer):
+                return
+            if self.server.verbose:
+                print(f"Erro ao decodificar JSON de {self.client_address}")
+            request = None
+        self._respond(self._execute_limited(request))
+
+    def _frames_received(self, data):
+        """Atender todas as requisições completas recebidas numa conexão persistente"""
+        self.last_activity = self.server.loop.time()
+        self.decoder.feed(data)
+        responses = []
+        try:
+            for payload in self.decoder.frames():
+                try:
+                    request = json.loads(payload)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    request = None
+                if not self.counted:
+                    response = dict(BUSY_RESPONSE, id=request.get("id") if isinstance(request, dict) else None)
+                    self.transport.write(encode_frame(json.dumps(response).encode('utf-8')))
+                    self.transport.close()
+                    return
+                responses.append(encode_frame(self._execute_limited(request), MAX_RESPONSE_SIZE))
+        except FrameTooLargeError:
+            responses.append(encode_frame(json.dumps(INVALID_JSON_RESPONSE).encode('utf-8')))
+            self.transport.writelines(responses)
+            self.transport.close()
+            return
+        self.transport.writelines(responses)
+
+    def _execute_limited(self, request):
+        """Executar uma requisição; respostas acima de MAX_RESPONSE_SIZE viram um erro"""
+        payload = self._execute(request)
+        if len(payload) <= MAX_RESPONSE_SIZE:
+            return payload
+        response = dict(RESPONSE_TOO_LARGE_RESPONSE)
+        if isinstance(request, dict) and request.get("id") is not None:
+            response["id"] = request["id"]
+        return json.dumps(response).encode('utf-8')
+
+    def _execute(self, request):
+        """Executar uma requisição e devolver a resposta codificada, com o mesmo id"""
+        if not isinstance(request, dict):
+            return json.dumps(INVALID_JSON_RESPONSE).encode('utf-8')
+        command = request.get("command")
+        request_id = request.get("id")
+        if self.server.verbose:
+            print(f"Comando recebido: {command} de {self.client_address}")
+        try:
+            if command == "LIST_ROOMS" and not _paginated(request):
+                payload = self.server._encoded_room_list()
+                if request_id is None:
+                    return payload
+                # Inserir o id na resposta já codificada
+                return b'{"id": ' + json.dumps(request_id).encode('utf-8') + b', ' + payload[1:]
+            response = self.server._process_command(command, request, self.client_address)
+        except Exception as e:
+            print(f"Erro ao manipular cliente {self.client_address}: {e}")
+            response = dict(INTERNAL_ERROR_RESPONSE)
+        if request_id is not None:
+            response["id"] = request_id
+        return json.dumps(response).encode('utf-8')
+
+    def _respond(self, payload):
+        self.transport.write(payload)
+        self.transport.close()
+
+    def pause_writing(self):
+        # O cliente envia mais rápido do que lê as respostas
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def connection_lost(self, exc):
+        if self.timeout is not None:
+            self.timeout.cancel()
+            self.timeout = None
+        if self.counted:
+            self.server.active_connections -= 1
+            self.counted = False
+
+
+def _paginated(request):
+    """Indica se um LIST_ROOMS pede uma página em vez da lista inteira"""
+    return "limit" in request or "cursor" in request or "filters" in request
+
+
+def _room_filter(filters):
+    """Devolve uma função que diz se uma sala passa pelos filtros"""
+    has_password = filters.get("has_password")
+    name = filters.get("name")
+    if name is not None:
+        name = name.casefold()
+    max_players = filters.get("max_players")
+
+    def match(room):
+        if has_password is not None and room.get("has_password", False) != has_password:
+            return False
+        if name is not None and name not in room["room_name"].casefold() \
+                and name not in room["host_name"].casefold():
+            return False
+        if max_players is not None and len(room["players"]) > max_players:
+            return False
+        return True
+
+    return match
+
+
+def _incomplete(error, data):
+    """Indica se o erro de decodificação vem de um JSON ainda incompleto"""
+    if isinstance(error, UnicodeDecodeError):
+        # Caractere multibyte cortado no fim
+        return error.end >= len(data) - 3
+    return error.pos >= len(error.doc.rstrip()) or error.msg.startswith("Unterminated string")
+
 
 class LobbyServer:
-    def __init__(self, host="0.0.0.0", port=5000):
+    """Servidor de lobby com um único laço de eventos asyncio.
+
+    Atende tanto clientes antigos, que abrem uma conexão por requisição,
+    quanto conexões persistentes com várias requisições em sequência (veja
+    _LobbyProtocol). Todas as conexões são atendidas na mesma thread, então
+    nenhuma requisição cria threads.
+    """
+
+    def __init__(self, host="0.0.0.0", port=5000, backlog=DEFAULT_BACKLOG, max_connections=MAX_CONNECTIONS,
+                 request_timeout=REQUEST_TIMEOUT, idle_timeout=IDLE_TIMEOUT, verbose=False):
         self.host = host
         self.port = port
+        self.backlog = backlog
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.idle_timeout = idle_timeout
+        self.verbose = verbose  # Mostrar cada comando recebido
         self.rooms = {}  # Armazena salas ativas
         self.server_socket = None
+        self.loop = None
+        self.stopped = None  # asyncio.Event que encerra o laço
+        self.active_connections = 0
+        self.rooms_version = 0  # Muda a cada alteração nas salas
+        self.room_list_cache = None  # (versão, válida até, resposta de LIST_ROOMS codificada)
+        self.room_ids_cache = None  # (versão, IDs das salas em ordem)
         self.running = False
-        self.lock = threading.Lock()  # Para acesso seguro ao dicionário de salas
         
     def generate_room_id(self):
         """Gera um ID de sala aleatório de 4 dígitos"""
         return ''.join(random.choices(string.digits, k=4))
         
     def start(self):
-        """Inicia o servidor de lobby"""
+        """Inicia o servidor de lobby e atende clientes até stop()"""
+        self.loop = asyncio.new_event_loop()
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            
-            self.running = True
-            print(f"Servidor de lobby iniciado em {self.host}:{self.port}")
-            
-            # Thread para limpar salas antigas
-            cleanup_thread = threading.Thread(target=self._cleanup_old_rooms)
-            cleanup_thread.daemon = True
-            cleanup_thread.start()
-            
-            # Loop principal para aceitar conexões
-            while self.running:
-                client_socket, client_address = self.server_socket.accept()
-                print(f"Nova conexão de {client_address}")
-                client_thread = threading.Thread(
-                    target=self._handle_client,
-                    args=(client_socket, client_address)
-                )
-                client_thread.daemon = True
-                client_thread.start()
-                
+            self.loop.run_until_complete(self._serve())
         except KeyboardInterrupt:
             print("Servidor interrompido pelo usuário")
         except Exception as e:
             print(f"Erro no servidor: {e}")
         finally:
-            self.stop()
+            self.running = False
+            self.loop.close()
+            self.loop = None
+
+    async def _serve(self):
+        self.stopped = asyncio.Event()
+        self.server_socket = await self.loop.create_server(
+            lambda: _LobbyProtocol(self),
+            self.host, self.port,
+            backlog=self.backlog,
+            reuse_address=True
+        )
+        self.running = True
+        print(f"Servidor de lobby iniciado em {self.host}:{self.port}")
+
+        # Tarefa para limpar salas antigas
+        cleanup_task = self.loop.create_task(self._cleanup_old_rooms())
+        try:
+            await self.stopped.wait()
+        finally:
+            cleanup_task.cancel()
+            self.server_socket.close()
+            self.server_socket = None
+            print("Servidor de lobby encerrado")
             
     def stop(self):
-        """Para o servidor de lobby"""
+        """Para o servidor de lobby (pode ser chamado de outra thread)"""
         self.running = False
-        if self.server_socket:
+        loop = self.loop
+        if loop is not None and self.stopped is not None:
             try:
-                self.server_socket.close()
-            except:
+                loop.call_soon_threadsafe(self.stopped.set)
+            except RuntimeError:
+                # O laço já foi fechado
                 pass
-            self.server_socket = None
-        print("Servidor de lobby encerrado")
-        
-    def _handle_client(self, client_socket, client_address):
-        """Manipula a conexão do cliente"""
-        try:
-            # Recebe a mensagem do cliente
-            data = client_socket.recv(4096)
-            if not data:
-                return
-                
-            # Analisa a mensagem
-            request = json.loads(data.decode('utf-8'))
-            command = request.get("command")
-            
-            print(f"Comando recebido: {command} de {client_address}")
-            
-            # Processa o comando
-            response = self._process_command(command, request, client_address)
-            
-            # Envia a resposta
-            client_socket.send(json.dumps(response).encode('utf-8'))
-        except json.JSONDecodeError:
-            print(f"Erro ao decodificar JSON de {client_address}")
-            response = {"status": "error", "message": "Formato JSON inválido"}
-            client_socket.send(json.dumps(response).encode('utf-8'))
-        except Exception as e:
-            print(f"Erro ao manipular cliente {client_address}: {e}")
-        finally:
-            client_socket.close()
-            
+
     def _process_command(self, command, request, client_address):
         """Processa comandos dos clientes"""
         if command == "CREATE_ROOM":
@@ -99,6 +301,8 @@ class LobbyServer:
         elif command == "JOIN_ROOM":
             return self._join_room(request)
         elif command == "LIST_ROOMS":
+            if _paginated(request):
+                return self._list_rooms_page(request)
             return self._list_rooms()
         elif command == "LEAVE_ROOM":
             return self._leave_room(request)
@@ -118,29 +322,29 @@ class LobbyServer:
             return {"status": "error", "message": "Nome do host é obrigatório"}
             
         # Gera um ID único para a sala
-        with self.lock:
+        room_id = self.generate_room_id()
+        while room_id in self.rooms:
             room_id = self.generate_room_id()
-            while room_id in self.rooms:
-                room_id = self.generate_room_id()
-            
-            # Usa o endereço IP do cliente como endereço de host
-            client_ip = client_address[0]
-            host_address = f"{client_ip}:{host_port}"
-            
-            # Cria a sala
-            room = {
-                "room_id": room_id,
-                "host_name": host_name,
-                "host_address": host_address,
-                "players": [host_name],
-                "room_name": room_name or f"Sala de {host_name}",
-                "has_password": password is not None and password != "",
-                "password": password,
-                "created_at": time.time()
-            }
-            
-            self.rooms[room_id] = room
-            
+        
+        # Usa o endereço IP do cliente como endereço de host
+        client_ip = client_address[0]
+        host_address = f"{client_ip}:{host_port}"
+        
+        # Cria a sala
+        room = {
+            "room_id": room_id,
+            "host_name": host_name,
+            "host_address": host_address,
+            "players": [host_name],
+            "room_name": room_name or f"Sala de {host_name}",
+            "has_password": password is not None and password != "",
+            "password": password,
+            "created_at": time.time()
+        }
+        
+        self.rooms[room_id] = room
+        self.rooms_version += 1
+        
         print(f"Sala criada: {room_id} por {host_name} em {host_address}")
             
         # Retorna uma cópia da sala sem a senha
@@ -163,26 +367,26 @@ class LobbyServer:
         if not room_id or not player_name:
             return {"status": "error", "message": "ID da sala e nome do jogador são obrigatórios"}
         
-        with self.lock:
-            if room_id not in self.rooms:
-                return {"status": "error", "message": "Sala não encontrada"}
-                
-            room = self.rooms[room_id]
+        if room_id not in self.rooms:
+            return {"status": "error", "message": "Sala não encontrada"}
+            
+        room = self.rooms[room_id]
+        
+        # Verifica a senha se necessário
+        if room.get("has_password", False) and room.get("password") != password:
+            return {"status": "error", "message": "Senha incorreta"}
+            
+        # Adiciona o jogador à sala se ainda não estiver
+        if player_name not in room["players"]:
+            room["players"].append(player_name)
+            self.rooms_version += 1
+            print(f"Jogador {player_name} entrou na sala {room_id}")
+            
+        # Retorna uma cópia da sala sem a senha
+        room_copy = room.copy()
+        if "password" in room_copy:
+            del room_copy["password"]
             
-            # Verifica a senha se necessário
-            if room.get("has_password", False) and room.get("password") != password:
-                return {"status": "error", "message": "Senha incorreta"}
-                
-            # Adiciona o jogador à sala se ainda não estiver
-            if player_name not in room["players"]:
-                room["players"].append(player_name)
-                print(f"Jogador {player_name} entrou na sala {room_id}")
-                
-            # Retorna uma cópia da sala sem a senha
-            room_copy = room.copy()
-            if "password" in room_copy:
-                del room_copy["password"]
-                
         return {
             "status": "success",
             "room": room_copy
@@ -194,20 +398,92 @@ class LobbyServer:
         current_time = time.time()
         active_rooms = []
         
-        with self.lock:
-            for room_id, room in self.rooms.items():
-                if current_time - room["created_at"] < 1800:  # 30 minutos
-                    # Cria uma cópia da sala sem a senha
-                    room_copy = room.copy()
-                    if "password" in room_copy:
-                        del room_copy["password"]
-                    active_rooms.append(room_copy)
-                
+        for room_id, room in self.rooms.items():
+            if current_time - room["created_at"] < 1800:  # 30 minutos
+                # Cria uma cópia da sala sem a senha
+                room_copy = room.copy()
+                if "password" in room_copy:
+                    del room_copy["password"]
+                active_rooms.append(room_copy)
+            
         return {
             "status": "success",
             "rooms": active_rooms
         }
         
+    def _list_rooms_page(self, request):
+        """Lista uma página de salas em ordem de ID, começando depois do cursor
+
+        O cursor é o ID da última sala da página anterior, então salas
+        criadas ou removidas entre as páginas não fazem outras se repetirem
+        nem sumirem. "next_cursor" é None na última página.
+        """
+        limit = request.get("limit", DEFAULT_PAGE_SIZE)
+        cursor = request.get("cursor")
+        filters = request.get("filters") or {}
+        if type(limit) is not int or limit < 1:
+            return {"status": "error", "message": "Limite inválido"}
+        if cursor is not None and not isinstance(cursor, str):
+            return {"status": "error", "message": "Cursor inválido"}
+        if not isinstance(filters, dict):
+            return {"status": "error", "message": "Filtros inválidos"}
+        for key, value in filters.items():
+            if key not in ROOM_FILTERS:
+                return {"status": "error", "message": f"Filtro desconhecido: {key}"}
+            if value is not None and type(value) is not ROOM_FILTERS[key]:
+                return {"status": "error", "message": f"Filtro inválido: {key}"}
+        limit = min(limit, MAX_PAGE_SIZE)
+        match = _room_filter(filters)
+
+        current_time = time.time()
+        rooms = []
+        next_cursor = None
+        room_ids = self._sorted_room_ids()
+        start = bisect.bisect_right(room_ids, cursor) if cursor is not None else 0
+        for i in range(start, len(room_ids)):
+            room = self.rooms[room_ids[i]]
+            if current_time - room["created_at"] >= 1800 or not match(room):
+                continue
+            if len(rooms) == limit:
+                next_cursor = rooms[-1]["room_id"]
+                break
+            # Cria uma cópia da sala sem a senha
+            room_copy = room.copy()
+            room_copy.pop("password", None)
+            rooms.append(room_copy)
+
+        return {
+            "status": "success",
+            "rooms": rooms,
+            "next_cursor": next_cursor
+        }
+
+    def _sorted_room_ids(self):
+        """IDs das salas em ordem, refeitos só quando as salas mudam"""
+        cache = self.room_ids_cache
+        if cache is not None and cache[0] == self.rooms_version:
+            return cache[1]
+        room_ids = sorted(self.rooms)
+        self.room_ids_cache = (self.rooms_version, room_ids)
+        return room_ids
+
+    def _encoded_room_list(self):
+        """Resposta de LIST_ROOMS já codificada, refeita só quando as salas mudam"""
+        now = time.time()
+        cache = self.room_list_cache
+        if cache is not None and cache[0] == self.rooms_version and now < cache[1]:
+            return cache[2]
+
+        version = self.rooms_version
+        payload = json.dumps(self._list_rooms()).encode('utf-8')
+        # A lista também muda quando a sala ativa mais antiga passa de 30 minutos
+        expires = min(
+            (room["created_at"] + 1800 for room in self.rooms.values() if now - room["created_at"] < 1800),
+            default=float("inf")
+        )
+        self.room_list_cache = (version, expires, payload)
+        return payload
+
     def _leave_room(self, request):
         """Remove um jogador de uma sala"""
         room_id = request.get("room_id")
@@ -216,28 +492,29 @@ class LobbyServer:
         if not room_id or not player_name:
             return {"status": "error", "message": "ID da sala e nome do jogador são obrigatórios"}
         
-        with self.lock:
-            if room_id not in self.rooms:
-                return {"status": "error", "message": "Sala não encontrada"}
-                
-            room = self.rooms[room_id]
+        if room_id not in self.rooms:
+            return {"status": "error", "message": "Sala não encontrada"}
+            
+        room = self.rooms[room_id]
+        
+        self.rooms_version += 1
+
+        # Remove o jogador da sala
+        if player_name in room["players"]:
+            room["players"].remove(player_name)
+            print(f"Jogador {player_name} saiu da sala {room_id}")
+            
+        # Se não houver mais jogadores, remove a sala
+        if not room["players"]:
+            del self.rooms[room_id]
+            print(f"Sala {room_id} removida (sem jogadores)")
+            return {"status": "success", "message": "Sala removida"}
+            
+        # Se o host saiu, define o próximo jogador como host
+        if player_name == room["host_name"] and room["players"]:
+            room["host_name"] = room["players"][0]
+            print(f"Novo host da sala {room_id}: {room['host_name']}")
             
-            # Remove o jogador da sala
-            if player_name in room["players"]:
-                room["players"].remove(player_name)
-                print(f"Jogador {player_name} saiu da sala {room_id}")
-                
-            # Se não houver mais jogadores, remove a sala
-            if not room["players"]:
-                del self.rooms[room_id]
-                print(f"Sala {room_id} removida (sem jogadores)")
-                return {"status": "success", "message": "Sala removida"}
-                
-            # Se o host saiu, define o próximo jogador como host
-            if player_name == room["host_name"] and room["players"]:
-                room["host_name"] = room["players"][0]
-                print(f"Novo host da sala {room_id}: {room['host_name']}")
-                
         return {"status": "success", "message": "Jogador removido da sala"}
         
     def _update_room(self, request):
@@ -248,43 +525,43 @@ class LobbyServer:
         if not room_id:
             return {"status": "error", "message": "ID da sala é obrigatório"}
         
-        with self.lock:
-            if room_id not in self.rooms:
-                return {"status": "error", "message": "Sala não encontrada"}
-                
-            room = self.rooms[room_id]
+        if room_id not in self.rooms:
+            return {"status": "error", "message": "Sala não encontrada"}
+            
+        room = self.rooms[room_id]
+        
+        # Atualiza a lista de jogadores
+        if players is not None:
+            room["players"] = players
+            self.rooms_version += 1
+            print(f"Lista de jogadores atualizada para sala {room_id}")
+            
+        # Retorna uma cópia da sala sem a senha
+        room_copy = room.copy()
+        if "password" in room_copy:
+            del room_copy["password"]
             
-            # Atualiza a lista de jogadores
-            if players is not None:
-                room["players"] = players
-                print(f"Lista de jogadores atualizada para sala {room_id}")
-                
-            # Retorna uma cópia da sala sem a senha
-            room_copy = room.copy()
-            if "password" in room_copy:
-                del room_copy["password"]
-                
         return {
             "status": "success",
             "room": room_copy
         }
         
-    def _cleanup_old_rooms(self):
+    async def _cleanup_old_rooms(self):
         """Remove salas antigas periodicamente"""
         while self.running:
-            time.sleep(60)  # Verifica a cada minuto
+            await asyncio.sleep(60)  # Verifica a cada minuto
             
             current_time = time.time()
             room_ids_to_remove = []
             
-            with self.lock:
-                for room_id, room in self.rooms.items():
-                    if current_time - room["created_at"] > 1800:  # 30 minutos
-                        room_ids_to_remove.append(room_id)
-                        
-                for room_id in room_ids_to_remove:
-                    del self.rooms[room_id]
+            for room_id, room in self.rooms.items():
+                if current_time - room["created_at"] > 1800:  # 30 minutos
+                    room_ids_to_remove.append(room_id)
                     
+            for room_id in room_ids_to_remove:
+                del self.rooms[room_id]
+            self.rooms_version += 1
+                
             if room_ids_to_remove:
                 print(f"Removidas {len(room_ids_to_remove)} salas antigas")
 
@@ -293,10 +570,14 @@ def main():
     parser = argparse.ArgumentParser(description="Servidor de Lobby para Blackjack P2P")
     parser.add_argument("--host", default="0.0.0.0", help="Endereço IP do servidor (padrão: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=5000, help="Porta do servidor (padrão: 5000)")
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                        help=f"Conexões pendentes aceitas pelo socket (padrão: {DEFAULT_BACKLOG})")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS,
+                        help=f"Conexões atendidas ao mesmo tempo (padrão: {MAX_CONNECTIONS})")
     
     args = parser.parse_args()
     
-    server = LobbyServer(host=args.host, port=args.port)
+    server = LobbyServer(host=args.host, port=args.port, backlog=args.backlog, max_connections=args.max_connections)
     
     try:
         server.start()
@@ -1,10 +1,87 @@
 import socket
+import select
 import json
 import threading
 import time
 import uuid
 import random
 import string
+from shared.network.framing import FrameDecoder, encode_frame
+
+# Conexões persistentes mantidas abertas com o servidor de lobby
+LOBBY_POOL_SIZE = 2
+# Conexões ociosas por mais tempo são descartadas (o servidor as fecha em 60 s)
+LOBBY_POOL_IDLE = 30.0
+# Tempo limite de cada requisição, em segundos
+LOBBY_TIMEOUT = 5
+# Tamanho máximo de uma resposta do servidor de lobby
+MAX_LOBBY_RESPONSE_SIZE = 1024 * 1024
+# Salas pedidas por página ao listar o lobby
+ROOM_PAGE_SIZE = 50
+# Maior página que o servidor devolve (MAX_PAGE_SIZE no lobby_server)
+MAX_ROOM_PAGE_SIZE = 200
+# Depois de achar um servidor antigo, tempo até tentar conexões persistentes de novo
+LEGACY_LOBBY_RETRY = 60.0
+# Comandos que podem ser reenviados sem risco se a conexão cair no meio
+IDEMPOTENT_COMMANDS = frozenset({"LIST_ROOMS", "UPDATE_ROOM"})
+
+
+class LegacyLobbyError(Exception):
+    """O servidor de lobby só entende uma requisição JSON por conexão"""
+
+
+class LobbyConnection:
+    """Conexão persistente com o servidor de lobby.
+
+    Cada requisição vai num quadro com prefixo de tamanho e um "id" que
+    volta na resposta; várias podem ser enviadas de uma vez antes de ler
+    as respostas.
+    """
+
+    def __init__(self, host, port, timeout=LOBBY_TIMEOUT):
+        self.socket = socket.create_connection((host, port), timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.decoder = FrameDecoder(MAX_LOBBY_RESPONSE_SIZE)
+        self.next_id = 0
+        self.last_used = time.time()
+
+    def request_many(self, requests):
+        """Envia várias requisições de uma vez e devolve as respostas na mesma ordem"""
+        ids = []
+        frames = []
+        for request in requests:
+            self.next_id += 1
+            ids.append(self.next_id)
+            frames.append(encode_frame(json.dumps(dict(request, id=self.next_id)).encode('utf-8')))
+        self.socket.sendall(b"".join(frames))
+
+        responses = {}
+        while len(responses) < len(ids):
+            if not self.decoder.recv_into(self.socket):
+                raise ConnectionResetError("Conexão fechada pelo servidor")
+            if self.decoder.buffer[self.decoder.start:self.decoder.start + 1] == b"{":
+                # Servidor antigo: respondeu JSON puro e fechou a conexão
+                raise LegacyLobbyError()
+            for payload in self.decoder.frames():
+                response = json.loads(payload)
+                responses[response.pop("id", None)] = response
+        self.last_used = time.time()
+        return [responses.get(request_id) for request_id in ids]
+
+    def is_closed(self):
+        """Indica, sem bloquear, se o servidor já fechou a conexão"""
+        try:
+            readable, _, _ = select.select([self.socket], [], [], 0)
+            return bool(readable) and self.socket.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
+
+    def close(self):
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
 
 class MatchmakingService:
     """Serviço de matchmaking para conectar jogadores"""
@@ -25,42 +102,150 @@ class MatchmakingService:
         self.room_cache = []
         self.last_refresh = 0
 
+        # Atualizações de sala enviadas em segundo plano (só a última por sala)
+        self.pending_room_updates = {}
+        self.room_update_lock = threading.Lock()
+        self.room_update_event = threading.Event()
+        self.room_update_thread = None
+
+        # Conexões persistentes com o servidor de lobby
+        self.lobby_pool = []
+        self.lobby_pool_lock = threading.Lock()
+        self.legacy_lobby_until = 0  # Até quando usar uma conexão por requisição (servidor antigo)
+
+    @property
+    def legacy_lobby(self):
+        return time.time() < self.legacy_lobby_until
+
     @staticmethod
     def generate_room_id():
         return ''.join(random.choices(string.digits, k=4))
 
     def _send_request(self, command, data=None):
         """Envia uma requisição para o servidor de matchmaking"""
-        if data is None:
-            data = {}
-            
-        # Adiciona o comando ao payload
-        data["command"] = command
-        
+        return self._send_requests([(command, data)])[0]
+
+    def _send_requests(self, requests):
+        """Envia várias requisições de uma vez, numa conexão persistente
+
+        Recebe pares (comando, dados) e devolve um par (sucesso, resposta)
+        para cada um, na mesma ordem.
+        """
+        payloads = []
+        for command, data in requests:
+            if data is None:
+                data = {}
+            # Adiciona o comando ao payload
+            data["command"] = command
+            payloads.append(data)
+
+        if not self.legacy_lobby:
+            try:
+                responses = self._pooled_request(payloads)
+                return [self._result(response) for response in responses]
+            except LegacyLobbyError:
+                # O servidor pode ser atualizado: tentar de novo mais tarde
+                self.legacy_lobby_until = time.time() + LEGACY_LOBBY_RETRY
+            except socket.timeout:
+                return [(False, "Tempo limite excedido ao conectar ao servidor")] * len(payloads)
+            except ConnectionRefusedError:
+                return [(False, "Servidor não está disponível")] * len(payloads)
+            except json.JSONDecodeError:
+                return [(False, "Resposta inválida do servidor")] * len(payloads)
+            except Exception as e:
+                return [(False, str(e))] * len(payloads)
+
+        return [self._send_legacy_request(payload) for payload in payloads]
+
+    @staticmethod
+    def _result(response):
+        if response is None:
+            return False, "Resposta inválida do servidor"
+        # Verifica se a resposta foi bem-sucedida
+        if response.get("status") == "success":
+            return True, response
+        return False, response.get("message", "Erro desconhecido")
+
+    def _pooled_request(self, payloads):
+        """Envia as requisições por uma conexão do pool, reconectando se ela tiver caído"""
+        connection, reused = self._acquire_connection()
+        try:
+            try:
+                responses = connection.request_many(payloads)
+            except (ConnectionResetError, BrokenPipeError):
+                # O servidor pode ter executado a requisição antes de fechar:
+                # só repetir as que não mudam nada se executadas duas vezes
+                if not reused or any(p["command"] not in IDEMPOTENT_COMMANDS for p in payloads):
+                    raise
+                # O servidor fechou a conexão ociosa: tentar numa nova
+                connection.close()
+                connection = LobbyConnection(self.server_host, self.server_port)
+                responses = connection.request_many(payloads)
+        except BaseException:
+            connection.close()
+            raise
+        self._release_connection(connection)
+        return responses
+
+    def _acquire_connection(self):
+        """Pega uma conexão livre do pool ou abre uma nova; diz se ela foi reaproveitada"""
+        now = time.time()
+        with self.lobby_pool_lock:
+            while self.lobby_pool:
+                connection = self.lobby_pool.pop()
+                if now - connection.last_used < LOBBY_POOL_IDLE and not connection.is_closed():
+                    return connection, True
+                connection.close()
+        return LobbyConnection(self.server_host, self.server_port), False
+
+    def _release_connection(self, connection):
+        with self.lobby_pool_lock:
+            if len(self.lobby_pool) < LOBBY_POOL_SIZE:
+                self.lobby_pool.append(connection)
+                return
+        connection.close()
+
+    def close_lobby_connections(self):
+        """Fecha as conexões persistentes com o servidor de lobby"""
+        with self.lobby_pool_lock:
+            pool = self.lobby_pool
+            self.lobby_pool = []
+        for connection in pool:
+            connection.close()
+
+    def _send_legacy_request(self, data):
+        """Envia uma requisição a um servidor antigo, numa conexão só para ela"""
         try:
             # Cria um socket TCP
             client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.settimeout(5)  # timeout de 5 segundos
+            client_socket.settimeout(LOBBY_TIMEOUT)
             
             # Tenta conectar ao servidor
             client_socket.connect((self.server_host, self.server_port))
             
-            # Envia a requisição
-            request = json.dumps(data).encode('utf-8')
-            client_socket.send(request)
-            
-            # Recebe a resposta
-            response_data = client_socket.recv(4096)
-            response = json.loads(response_data.decode('utf-8'))
-            
-            client_socket.close()
-            
-            # Verifica se a resposta foi bem-sucedida
-            if response.get("status") == "success":
-                return True, response
-            else:
-                return False, response.get("message", "Erro desconhecido")
-                
+            try:
+                # Envia a requisição
+                request = json.dumps(data).encode('utf-8')
+                client_socket.sendall(request)
+
+                # Recebe a resposta, que pode chegar em vários pedaços: o
+                # servidor fecha a conexão depois de enviá-la inteira
+                chunks = []
+                size = 0
+                while True:
+                    chunk = client_socket.recv(65536)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > MAX_LOBBY_RESPONSE_SIZE:
+                        return False, "Resposta do servidor grande demais"
+                    chunks.append(chunk)
+                response = json.loads(b"".join(chunks).decode('utf-8'))
+            finally:
+                client_socket.close()
+
+            return self._result(response)
+
         except socket.timeout:
             return False, "Tempo limite excedido ao conectar ao servidor"
         except ConnectionRefusedError:
@@ -91,20 +276,51 @@ class MatchmakingService:
         
         return self._send_request("JOIN_ROOM", data)
         
-    def list_games(self):
-        """Lista todas as salas disponíveis no servidor"""
+    def list_games(self, limit=None, cursor=None, filters=None):
+        """Lista as salas disponíveis no servidor
+
+        Sem argumentos busca todas as salas, uma página por vez. Com limit,
+        cursor ou filters devolve uma página só; o "next_cursor" da resposta
+        pede a página seguinte e é None na última. Filtros aceitos:
+        has_password, name (parte do nome da sala ou do host) e max_players.
+        """
+        if limit is not None or cursor is not None or filters:
+            return self._send_request("LIST_ROOMS", self._page_request(limit or ROOM_PAGE_SIZE, cursor, filters))
+
         # Cache de 5 segundos para evitar sobrecarga no servidor
         current_time = time.time()
         if current_time - self.last_refresh < 5 and self.room_cache:
             return True, {"rooms": self.room_cache}
-            
-        result = self._send_request("LIST_ROOMS")
-        
-        if result[0]:
-            self.room_cache = result[1].get("rooms", [])
-            self.last_refresh = current_time
-            
-        return result
+
+        # As páginas não podem ir juntas como as atualizações de sala: o
+        # cursor de cada uma é o último ID da resposta anterior. Por isso
+        # cada página é a maior que o servidor aceita, e todas vão pela
+        # mesma conexão persistente
+        rooms = []
+        cursor = None
+        while True:
+            success, response = self._send_request("LIST_ROOMS", self._page_request(MAX_ROOM_PAGE_SIZE, cursor))
+            if not success:
+                return success, response
+            rooms.extend(response.get("rooms", []))
+            next_cursor = response.get("next_cursor")
+            # Servidores antigos ignoram a paginação e mandam a lista inteira
+            if next_cursor is None or next_cursor == cursor:
+                break
+            cursor = next_cursor
+
+        self.room_cache = rooms
+        self.last_refresh = current_time
+        return True, {"status": "success", "rooms": rooms}
+
+    @staticmethod
+    def _page_request(limit, cursor=None, filters=None):
+        data = {"limit": limit}
+        if cursor is not None:
+            data["cursor"] = cursor
+        if filters:
+            data["filters"] = filters
+        return data
         
     def leave_room(self, room_id, player_name):
         """Remove um jogador de uma sala"""
@@ -124,6 +340,40 @@ class MatchmakingService:
         
         return self._send_request("UPDATE_ROOM", data)
 
+    def update_room_async(self, room_id, players):
+        """Atualiza uma sala em segundo plano, sem bloquear quem chama
+
+        Se várias atualizações da mesma sala se acumularem, só a mais recente
+        é enviada.
+        """
+        with self.room_update_lock:
+            self.pending_room_updates[room_id] = list(players)
+            if self.room_update_thread is None:
+                self.room_update_thread = threading.Thread(target=self._room_update_service)
+                self.room_update_thread.daemon = True
+                self.room_update_thread.start()
+        self.room_update_event.set()
+
+    def _room_update_service(self):
+        """Envia as atualizações de sala pendentes"""
+        while True:
+            self.room_update_event.wait()
+            self.room_update_event.clear()
+            with self.room_update_lock:
+                pending = self.pending_room_updates
+                self.pending_room_updates = {}
+
+            if not pending:
+                continue
+            # Todas as salas pendentes vão de uma vez, na mesma conexão
+            results = self._send_requests([
+                ("UPDATE_ROOM", {"room_id": room_id, "players": players})
+                for room_id, players in pending.items()
+            ])
+            for success, response in results:
+                if not success:
+                    print(f"Erro ao atualizar sala no matchmaking: {response}")
+
     def create_local_game(self, host_name, room_name=None, password=None):
         """Criar uma nova sala de jogo na rede local"""
         try:
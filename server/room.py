@@ -9,7 +9,11 @@ from shared import config
 from shared.models.game import Game
 from shared.models.player import Player
 from shared.network.message import Message, MessageType, ActionType
-from shared.network.p2p_manager import P2PManager
+from shared.network.p2p_manager import P2PManager, STATE_QUEUE_KEY
+from shared.network.state_sync import StateSync, apply_delta
+
+# Intervalo mínimo entre envios do estado do jogo, em ms (0 = uma vez por tick)
+BROADCAST_INTERVAL = 0
 
 
 def on_player_connected(player_id, player_data):
@@ -56,6 +60,12 @@ class Room:
         # Matchmaking e rede
         self.matchmaking_service = None
         self.p2p_manager = None
+        self.last_broadcast_version = None
+        self.state_sync = None  # Host: per-peer delta state (see broadcast_game_state)
+        self.broadcast_pending = False
+        self.broadcast_interval = BROADCAST_INTERVAL
+        self.last_broadcast_time = 0
+        self.last_lobby_players = None
 
     def render_create_room(self):
         """Renderizar a tela de criação de sala"""
@@ -204,6 +214,7 @@ class Room:
             # Registrar callbacks
             self.p2p_manager.register_message_callback(self.on_message_received)
             self.p2p_manager.register_disconnection_callback(self.on_player_disconnected)
+            self.p2p_manager.register_resume_callback(self.on_player_resumed)
             
             # Iniciar o servidor P2P
             self.p2p_manager.start()
@@ -212,6 +223,10 @@ class Room:
             from shared.models.game import Game
             self.game = Game()
             self.game.initialize_game(self.player)
+            self.last_broadcast_version = None
+            self.state_sync = StateSync()
+            self.broadcast_pending = False
+            self.last_lobby_players = None
             
             # Configurar como host
             self.host_mode = True
@@ -789,6 +804,7 @@ class Room:
             # Registrar callbacks
             self.p2p_manager.register_message_callback(self.on_message_received)
             self.p2p_manager.register_disconnection_callback(self.on_player_disconnected)
+            self.p2p_manager.register_resume_callback(self.on_player_resumed)
             
             # Conectar ao host
             success, message = self.p2p_manager.connect_to_host(host_ip)
@@ -860,6 +876,7 @@ class Room:
         self.p2p_manager.register_message_callback(self.on_message_received)
         self.p2p_manager.register_connection_callback(on_player_connected)
         self.p2p_manager.register_disconnection_callback(self.on_player_disconnected)
+        self.p2p_manager.register_resume_callback(self.on_player_resumed)
         self.p2p_manager.start()
 
         # Conectar ao host
@@ -1041,7 +1058,7 @@ class Room:
                         bet_amount = message.content.get("amount", 0)
                         success, msg = self.game.place_bet(sender_id, bet_amount)
                         if success:
-                            player = next((p for p in self.game.state_manager.players if p.player_id == sender_id), None)
+                            player = self.game.state_manager.get_player(sender_id)
                             if player and hasattr(self.game, "messages"):
                                 self.game.messages.append(f"{player.name} apostou {bet_amount}")
                     
@@ -1059,14 +1076,21 @@ class Room:
             elif message.msg_type == MessageType.GAME_STATE:
                 # Atualizar estado do jogo recebido do host
                 self.game_state = message.content
-                
-                # Passar o estado para o game_client se estiver disponível
-                if hasattr(self, 'game_client'):
-                    self.game_client.game_state = self.game_state
-                    
-                    # Se o jogo começou, mudar para a tela de jogo
-                    if self.game_state.get("state") != "LOBBY":
-                        self.view_manager.set_view("GAME")
+                self.on_game_state_updated()
+
+            elif message.msg_type == MessageType.GAME_STATE_DELTA:
+                # Aplicar as mudanças sobre a versão que já temos
+                content = message.content
+                if self.game_state is not None and self.game_state.get("version") == content["base"]:
+                    apply_delta(self.game_state, content["delta"])
+                    self.on_game_state_updated()
+                else:
+                    # Fora de sincronia: pedir o estado completo ao host
+                    self.send_state_ack(resync=True)
+
+            elif message.msg_type == MessageType.STATE_ACK:
+                if self.host_mode and self.state_sync:
+                    self.state_sync.acknowledge(sender_id, message.content)
             
             # Não precisamos de REQUEST_UPDATE, usaremos o sistema existente
                     
@@ -1075,9 +1099,48 @@ class Room:
             import traceback
             traceback.print_exc()
 
+    def on_game_state_updated(self):
+        """Confirmar e exibir um estado do jogo recebido do host (cliente)"""
+        self.send_state_ack()
+
+        # Passar o estado para o game_client se estiver disponível
+        if hasattr(self, 'game_client'):
+            self.game_client.game_state = self.game_state
+
+            # Se o jogo começou, mudar para a tela de jogo
+            if self.game_state.get("state") != "LOBBY":
+                self.view_manager.set_view("GAME")
+
+    def send_state_ack(self, resync=False):
+        """Informar ao host a versão do estado que temos"""
+        if not self.p2p_manager or not self.player:
+            return
+        state = self.game_state or {}
+        ack = Message.create_state_ack_message(
+            self.player.player_id, state.get("game_id"), state.get("version"), resync
+        )
+        self.p2p_manager.send_message(ack)
+
+    def on_player_resumed(self, player_id, data):
+        """Callback para quando um jogador volta após uma queda breve de conexão"""
+        print(f"Jogador reconectado: {player_id}")
+        caught_up = data.get("caught_up", False)
+        if self.host_mode:
+            if not caught_up and self.state_sync:
+                # Perdeu mensagens demais: enviar o estado completo
+                self.state_sync.acknowledge(player_id, {"resync": True})
+            # Mandar o que mudou enquanto ele estava fora
+            self.last_broadcast_version = None
+            self.broadcast_game_state()
+        elif not caught_up:
+            # Pedir o estado completo ao host
+            self.send_state_ack(resync=True)
+
     def on_player_disconnected(self, player_id):
         """Callback para quando um jogador se desconecta"""
         print(f"Jogador desconectado: {player_id}")
+        if self.state_sync:
+            self.state_sync.remove_peer(player_id)
 
         # Se somos o host, remover o jogador do jogo
         if self.host_mode and self.game:
@@ -1142,7 +1205,12 @@ class Room:
             self.view_manager.set_view("MENU")
 
     def broadcast_game_state(self):
-        """Enviar o estado atual do jogo para todos os jogadores conectados"""
+        """Marcar o estado do jogo para ser enviado aos jogadores conectados
+
+        O envio em si acontece uma vez por tick em flush_broadcast(), por mais
+        que esta função seja chamada nesse meio tempo. O estado local é
+        atualizado na hora.
+        """
         if not hasattr(self, 'p2p_manager') or not self.p2p_manager:
             return
             
@@ -1157,25 +1225,8 @@ class Room:
             # Atualizar o cliente do jogo se disponível
             if hasattr(self, 'game_client'):
                 self.game_client.game_state = game_state
-                
-            # Se o p2p manager estiver disponível, enviar para todos os jogadores
-            from shared.network.message import Message, MessageType
-            game_state_message = Message(
-                msg_type=MessageType.GAME_STATE,
-                sender_id=self.player.player_id,
-                content=game_state
-            )
-            
-            # Broadcast para todos os jogadores conectados
-            self.p2p_manager.send_message(game_state_message)
-            
-            # Também atualizar o estado no serviço de matchmaking se estiver no modo online
-            if self.view_manager.connection_mode == "online" and self.room_id:
-                players = [p["name"] for p in game_state["players"]]
-                try:
-                    self.matchmaking_service.update_room(self.room_id, players)
-                except Exception as e:
-                    print(f"Erro ao atualizar sala no matchmaking: {e}")
+
+            self.broadcast_pending = True
         
         # Se for cliente, não faz broadcast, apenas atualiza o estado local
         elif hasattr(self, 'game_state') and self.game_state:
@@ -1183,6 +1234,43 @@ class Room:
             if hasattr(self, 'game_client'):
                 self.game_client.game_state = self.game_state
 
+    def flush_broadcast(self):
+        """Enviar o estado marcado por broadcast_game_state() (uma vez por tick)"""
+        if not self.broadcast_pending:
+            return
+        now = pygame.time.get_ticks()
+        if self.broadcast_interval and now - self.last_broadcast_time < self.broadcast_interval:
+            return
+        self.broadcast_pending = False
+        self.last_broadcast_time = now
+
+        if not self.p2p_manager or not (self.host_mode and self.game):
+            return
+        game_state = self.game.get_game_state()
+
+        # Nada mudou desde o último envio: não retransmitir
+        if game_state["version"] == self.last_broadcast_version:
+            return
+        self.last_broadcast_version = game_state["version"]
+
+        # Cada jogador recebe só o que mudou desde a última versão enviada
+        # a ele, ou o estado completo se estiver fora de sincronia. Um
+        # estado ainda na fila de um jogador lento é substituído pelo novo
+        p2p_manager = self.p2p_manager
+        peers = list(p2p_manager.connections)
+        updates = self.state_sync.messages_for(
+            peers, game_state, self.player.player_id, p2p_manager.pending_tag
+        )
+        for message, peer_ids, tag in updates:
+            p2p_manager.send_to(message, peer_ids, STATE_QUEUE_KEY, tag)
+
+        # Avisar o matchmaking só quando a lista de jogadores muda, em segundo plano
+        if self.view_manager.connection_mode == "online" and self.room_id:
+            players = [p["name"] for p in game_state["players"]]
+            if players != self.last_lobby_players:
+                self.last_lobby_players = players
+                self.matchmaking_service.update_room_async(self.room_id, players)
+
     def render_lobby(self):
         """Renderizar a tela de lobby/sala de espera"""
         # Background
@@ -1358,17 +1446,9 @@ class Room:
                 
             # Iniciar o jogo
             self.game.start_game()
-            self.game_state = self.game.get_game_state()
             
             # Transmitir estado para todos os jogadores
-            from shared.network.message import Message, MessageType
-            start_message = Message(
-                msg_type=MessageType.GAME_STATE,
-                sender_id=self.player.player_id,
-                content=self.game_state
-            )
-            
-            self.p2p_manager.send_message(start_message)
+            self.broadcast_game_state()
             
             # Mudar para a tela de jogo
             self.view_manager.set_view("GAME")
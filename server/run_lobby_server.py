@@ -11,7 +11,7 @@ import argparse
 # Adicionar o diretório raiz ao path para importar os módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from server.lobby_server import LobbyServer
+from server.lobby_server import LobbyServer, DEFAULT_BACKLOG, MAX_CONNECTIONS
 
 def main():
     """Função principal para iniciar o servidor de lobby"""
@@ -26,6 +26,12 @@ def main():
     parser.add_argument("--debug", action="store_true", 
                       help="Ativar mensagens de debug detalhadas")
     
+    parser.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG,
+                      help=f"Conexões pendentes aceitas pelo socket (padrão: {DEFAULT_BACKLOG})")
+    
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS,
+                      help=f"Conexões atendidas ao mesmo tempo (padrão: {MAX_CONNECTIONS})")
+    
     args = parser.parse_args()
     
     print("=== Servidor de Lobby Blackjack 21 P2P ===")
@@ -35,7 +41,13 @@ def main():
         print("Modo de debug ativado")
     
     # Iniciar o servidor
-    server = LobbyServer(host=args.host, port=args.port)
+    server = LobbyServer(
+        host=args.host,
+        port=args.port,
+        backlog=args.backlog,
+        max_connections=args.max_connections,
+        verbose=args.debug
+    )
     
     try:
         server.start()
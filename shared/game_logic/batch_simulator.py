@@ -0,0 +1,146 @@
+import time
+from shared.models.card import BLACKJACK_VALUES
+from shared.game_logic.bot_strategy import BOT_STRATEGY_LIMITS
+from shared.game_logic.simulator import SimulationResult, StrategyStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class BatchSimulator:
+    """Plays many tables of threshold bots at once with NumPy arrays.
+
+    Each batch holds K tables x P seats. Every table gets a freshly shuffled
+    shoe per round (like Simulator with penetration=0), the seats play in
+    order as masked array operations and the pot goes to the highest
+    non-busted hands exactly as in Game._end_round: split evenly between
+    tied winners, remainder to the first of them. Only threshold strategies
+    can be vectorized; use Simulator for anything else.
+    """
+
+    def __init__(self, strategies, tables=10000, bet=100, num_decks=1, seed=None):
+        if np is None:
+            raise ImportError("BatchSimulator requires numpy")
+        if len(strategies) < 2:
+            raise ValueError("Need at least 2 strategies to play")
+        # Until every seat has its second card, more undealt cards must remain
+        # than there are ten-value cards, so a redraw can always avoid 21
+        shoe_size = len(BLACKJACK_VALUES) * num_decks
+        ten_cards = BLACKJACK_VALUES.count(10) * num_decks
+        max_seats = (shoe_size - ten_cards) // 2
+        if len(strategies) > max_seats:
+            raise ValueError(f"At most {max_seats} seats fit a {num_decks}-deck shoe")
+        self.strategies = list(strategies)
+        self.limits = np.array([self._limit(name) for name in self.strategies], dtype=np.int16)
+        self.tables = tables
+        self.bet = bet
+        self.num_decks = num_decks
+        self.rng = np.random.default_rng(seed)
+        self.points = np.array(BLACKJACK_VALUES, dtype=np.int8)
+
+    @staticmethod
+    def _limit(strategy):
+        if isinstance(strategy, int):
+            return strategy
+        if strategy not in BOT_STRATEGY_LIMITS:
+            raise ValueError(f"No threshold for strategy {strategy!r}")
+        return BOT_STRATEGY_LIMITS[strategy]
+
+    @staticmethod
+    def _values(hard, aces):
+        """Best hand values for arrays of hard totals and ace counts"""
+        return hard + 10 * ((aces > 0) & (hard <= 11))
+
+    def _new_shoes(self):
+        """Return a (tables, shoe size) array of card points in unshuffled order"""
+        return np.tile(self.points, (self.tables, self.num_decks))
+
+    def _draw(self, shoes, idx, cursor):
+        """Draw the card at the cursor of the given tables.
+
+        The shoes are shuffled lazily: before a card is drawn it is swapped
+        with a random undealt card (one Fisher-Yates step), so only the
+        cards actually dealt are ever shuffled. The cursor is not advanced.
+        """
+        pos = cursor[idx]
+        swap = pos + self.rng.integers(0, shoes.shape[1] - pos)
+        picked = shoes[idx, swap]
+        shoes[idx, swap] = shoes[idx, pos]
+        shoes[idx, pos] = picked
+        return picked
+
+    def play_batch(self):
+        """Play one round on every table; return the (tables, seats) balance deltas"""
+        tables = self.tables
+        seats = len(self.strategies)
+        shoes = self._new_shoes()
+        shoe_size = shoes.shape[1]
+        rows = np.arange(tables)
+        cursor = np.zeros(tables, dtype=np.int64)
+        hard = np.zeros((tables, seats), dtype=np.int16)
+        aces = np.zeros((tables, seats), dtype=np.int16)
+
+        # Initial deal: two rounds of one card per seat, no 21 allowed
+        for _ in range(2):
+            for seat in range(seats):
+                card = self._draw(shoes, rows, cursor)
+                redraw = self._values(hard[:, seat] + card, aces[:, seat] + (card == 1)) == 21
+                while redraw.any():
+                    # The card goes back among the undealt ones and another is drawn
+                    idx = rows[redraw]
+                    card[idx] = self._draw(shoes, idx, cursor)
+                    redraw = self._values(hard[:, seat] + card, aces[:, seat] + (card == 1)) == 21
+                hard[:, seat] += card
+                aces[:, seat] += card == 1
+                cursor += 1
+
+        # Player turns: each seat hits while below its limit
+        for seat in range(seats):
+            limit = self.limits[seat]
+            value = self._values(hard[:, seat], aces[:, seat])
+            active = (value < limit) & (value < 21) & (cursor < shoe_size)
+            while active.any():
+                idx = rows[active]
+                card = self._draw(shoes, idx, cursor)
+                hard[idx, seat] += card
+                aces[idx, seat] += card == 1
+                cursor[idx] += 1
+                value = self._values(hard[:, seat], aces[:, seat])
+                active = (value < limit) & (value < 21) & (cursor < shoe_size)
+
+        # Settlement
+        values = self._values(hard, aces)
+        busted = values > 21
+        scores = np.where(busted, -1, values)
+        best = scores.max(axis=1)
+        winners = (scores == best[:, None]) & ~busted
+        winner_count = winners.sum(axis=1)
+        pot = self.bet * seats
+        prize = np.where(winner_count > 0, pot // np.maximum(winner_count, 1), 0)
+        remainder = np.where(winner_count > 0, pot - prize * winner_count, 0)
+        first = np.argmax(winners, axis=1)
+
+        deltas = np.where(winners, prize[:, None], 0).astype(np.int64) - self.bet
+        deltas[rows, first] += np.where(winner_count > 0, remainder, 0)
+        return deltas
+
+    def run(self, rounds):
+        """Play at least the given number of rounds (whole batches) and return a SimulationResult"""
+        stats = {name: StrategyStats() for name in self.strategies}
+        batches = max(1, -(-rounds // self.tables))
+        started = time.perf_counter()
+
+        for _ in range(batches):
+            deltas = self.play_batch()
+            for seat, name in enumerate(self.strategies):
+                column = deltas[:, seat]
+                stats[name].merge(StrategyStats(
+                    len(column),
+                    int((column > 0).sum()),
+                    int(column.sum()),
+                    int((column * column).sum())
+                ))
+
+        return SimulationResult(stats, batches * self.tables, time.perf_counter() - started)
@@ -0,0 +1,56 @@
+from shared.game_logic.expected_value import ExpectedValueCalculator
+
+# Hand value at which each named bot strategy stops asking for cards
+BOT_STRATEGY_LIMITS = {
+    "conservative": 15,
+    "default": 17,
+    "aggressive": 18
+}
+
+# Calculator shared by every expected-value bot, so its memo cache is reused
+_shared_calculator = None
+
+
+class ThresholdStrategy:
+    """Hit while the hand value is below a fixed limit"""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def should_hit(self, player, game):
+        """Decide whether the player should ask for another card"""
+        return player.hand.get_value() < self.limit
+
+
+class ExpectedValueStrategy:
+    """Hit when the exact expected value of hitting beats standing"""
+
+    def __init__(self, calculator=None):
+        self.calculator = calculator if calculator else ExpectedValueCalculator()
+
+    def should_hit(self, player, game):
+        """Decide whether the player should ask for another card"""
+        players = game.state_manager.players
+        target, tied = self.calculator.best_opponents(players, player)
+        pot = sum(p.current_bet for p in players)
+        result = self.calculator.evaluate(player.hand, game.deck.rank_counts, target, pot, player.current_bet, tied)
+        return result["best"] == "hit"
+
+
+def shared_calculator():
+    """Return the ExpectedValueCalculator shared by get_strategy()'s bots"""
+    global _shared_calculator
+    if _shared_calculator is None:
+        _shared_calculator = ExpectedValueCalculator()
+    return _shared_calculator
+
+
+def get_strategy(name):
+    """Return the strategy object for a strategy name
+
+    Build it once per bot and keep it: expected-value strategies share one
+    calculator, whose cache fills up as the bots play.
+    """
+    if name == "expected_value":
+        return ExpectedValueStrategy(shared_calculator())
+    return ThresholdStrategy(BOT_STRATEGY_LIMITS.get(name, BOT_STRATEGY_LIMITS["default"]))
@@ -0,0 +1,116 @@
+from shared.models.shoe import RANK_COUNT
+
+
+class ExpectedValueCalculator:
+    """Exact hit/stand expected values against the remaining shoe.
+
+    The pot goes to the player(s) holding the highest non-busted hand and is
+    split evenly on a tie (see Game._end_round). For a hand, the outcome
+    therefore only depends on the best opponent value ("target") and on how
+    many opponents hold it. Expected pot shares are computed by dynamic
+    programming over (hard total, soft ace, remaining rank counts, target,
+    tied opponents) and memoized in a bounded cache shared across queries.
+    """
+
+    def __init__(self, max_cache_entries=500000):
+        self.max_cache_entries = max_cache_entries
+        self._cache = {}
+
+    @staticmethod
+    def best_opponents(players, player):
+        """Return the highest non-busted value among the other players and how many hold it"""
+        best = 0
+        count = 0
+        for other in players:
+            if other is player or other.hand.is_busted:
+                continue
+            value = other.hand.get_value()
+            if value > best:
+                best = value
+                count = 1
+            elif value == best:
+                count += 1
+        return best, count
+
+    def clear_cache(self):
+        """Drop all memoized states"""
+        self._cache.clear()
+
+    def expected_share(self, hard_total, aces, rank_counts, target, tied=0):
+        """Return the expected pot share of a hand played optimally from here
+
+        rank_counts lists the undealt cards of each value from ace to ten.
+        """
+        return self._solve(hard_total, aces > 0 and hard_total <= 11, tuple(rank_counts), target, tied)
+
+    def evaluate(self, hand, rank_counts, target, pot, bet, tied=0):
+        """Return the expected balance change of standing and of hitting
+
+        Returns a dict with the "stand" and "hit" values and the "best"
+        action. Opponents who have not played yet are assumed to keep their
+        current hands.
+        """
+        counts = tuple(rank_counts)
+        hard = hand.hard_total
+        soft = hand.aces > 0 and hard <= 11
+        value = hand.get_value()
+
+        stand_share = self._stand_share(value, target, tied)
+        # Players cannot hit once they reach 21
+        hit_share = self._hit(hard, soft, counts, target, tied) if value < 21 else 0.0
+
+        stand_ev = stand_share * pot - bet
+        hit_ev = hit_share * pot - bet
+        return {
+            "stand": stand_ev,
+            "hit": hit_ev,
+            "best": "hit" if hit_ev > stand_ev else "stand"
+        }
+
+    @staticmethod
+    def _stand_share(value, target, tied):
+        """Pot share won by standing on a value"""
+        if value > 21 or value < target:
+            return 0.0
+        if value == target and tied:
+            return 1.0 / (tied + 1)
+        return 1.0
+
+    def _solve(self, hard, soft, counts, target, tied):
+        """Expected pot share with optimal hit/stand decisions"""
+        value = hard + 10 if soft else hard
+        stand = self._stand_share(value, target, tied)
+        # Nothing beats an outright win, and 21 cannot be hit
+        if stand == 1.0 or value >= 21:
+            return stand
+
+        key = (hard, soft, counts, target, tied)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = max(stand, self._hit(hard, soft, counts, target, tied))
+
+        if len(self._cache) >= self.max_cache_entries:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _hit(self, hard, soft, counts, target, tied):
+        """Expected pot share of taking exactly one card and then playing on"""
+        remaining = sum(counts)
+        if not remaining:
+            return 0.0
+
+        total = 0.0
+        limit = min(RANK_COUNT, 21 - hard)
+        for i in range(limit):
+            count = counts[i]
+            if not count:
+                continue
+            points = i + 1
+            new_hard = hard + points
+            new_soft = new_hard <= 11 and (soft or points == 1)
+            new_counts = counts[:i] + (count - 1,) + counts[i + 1:]
+            total += count * self._solve(new_hard, new_soft, new_counts, target, tied)
+        return total / remaining
@@ -0,0 +1,146 @@
+import json
+import time
+from collections import deque
+
+
+class EventType:
+    INITIALIZE_GAME = "initialize_game"
+    ADD_PLAYER = "add_player"
+    REMOVE_PLAYER = "remove_player"
+    START_GAME = "start_game"
+    PLACE_BET = "place_bet"
+    HIT = "hit"
+    STAND = "stand"
+    START_NEW_ROUND = "start_new_round"
+    SET_PLAYER_BALANCE = "set_player_balance"
+    ROUND_ENDED = "round_ended"
+
+
+# Events that change the game and are re-executed by Game.replay()
+ACTION_EVENTS = frozenset({
+    EventType.INITIALIZE_GAME,
+    EventType.ADD_PLAYER,
+    EventType.REMOVE_PLAYER,
+    EventType.START_GAME,
+    EventType.PLACE_BET,
+    EventType.HIT,
+    EventType.STAND,
+    EventType.START_NEW_ROUND,
+    EventType.SET_PLAYER_BALANCE
+})
+
+
+class GameEvent:
+    __slots__ = ("seq", "timestamp", "event_type", "player_id", "data")
+
+    def __init__(self, seq, event_type, player_id=None, data=None, timestamp=None):
+        self.seq = seq
+        self.timestamp = timestamp if timestamp else int(time.time() * 1000)
+        self.event_type = event_type
+        self.player_id = player_id
+        self.data = data or {}
+
+    def to_dict(self):
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "type": self.event_type,
+            "player_id": self.player_id,
+            "data": self.data
+        }
+
+    @classmethod
+    def from_dict(cls, event_dict):
+        return cls(
+            event_dict["seq"],
+            event_dict["type"],
+            event_dict.get("player_id"),
+            event_dict.get("data"),
+            event_dict.get("timestamp")
+        )
+
+    def __repr__(self):
+        return f"GameEvent({self.seq}, {self.event_type}, {self.player_id}, {self.data})"
+
+
+class EventJournal:
+    """Append-only journal of typed game events with segment rotation.
+
+    Events are kept in fixed-size segments. Once more than max_segments are
+    held, the oldest segment is handed to the sink (if any) and dropped, so
+    memory stays constant however long the game runs.
+    """
+
+    def __init__(self, segment_size=500, max_segments=4, sink=None):
+        if segment_size < 1 or max_segments < 1:
+            raise ValueError("Journal segments must hold at least one event")
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.sink = sink
+        self.segments = deque([[]])
+        self.next_seq = 0
+        self.rotated_events = 0
+
+    def append(self, event_type, player_id=None, **data):
+        """Record an event and return it"""
+        event = GameEvent(self.next_seq, event_type, player_id, data)
+        self.next_seq += 1
+
+        segment = self.segments[-1]
+        if len(segment) >= self.segment_size:
+            segment = []
+            self.segments.append(segment)
+            if len(self.segments) > self.max_segments:
+                self._rotate()
+        segment.append(event)
+        return event
+
+    def _rotate(self):
+        """Hand the oldest segment to the sink and drop it"""
+        oldest = self.segments.popleft()
+        self.rotated_events += len(oldest)
+        if self.sink:
+            self.sink(oldest)
+
+    def flush(self):
+        """Hand every held event to the sink"""
+        if not self.sink:
+            return
+        for segment in self.segments:
+            if segment:
+                self.sink(segment)
+        self.rotated_events += sum(len(segment) for segment in self.segments)
+        self.segments = deque([[]])
+
+    @property
+    def is_complete(self):
+        """True while no event has been rotated out of memory"""
+        return self.rotated_events == 0
+
+    def events(self):
+        """Iterate over the events still held in memory, oldest first"""
+        for segment in self.segments:
+            yield from segment
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+
+class JsonLinesSink:
+    """Journal sink that appends rotated events to a JSON-lines file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, events):
+        with open(self.path, "a", encoding="utf-8") as file:
+            for event in events:
+                file.write(json.dumps(event.to_dict()) + "\n")
+
+    def load(self):
+        """Return every event written to the file"""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return [GameEvent.from_dict(json.loads(line)) for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,158 @@
+import argparse
+import time
+from shared.models.game import Game
+from shared.models.player import Player
+from shared.game_logic.state_manager import GameState
+from shared.game_logic.bot_strategy import get_strategy
+
+
+class StrategyStats:
+    """Per-strategy totals, mergeable across simulation runs"""
+
+    __slots__ = ("rounds", "wins", "total_delta", "total_sq_delta")
+
+    def __init__(self, rounds=0, wins=0, total_delta=0, total_sq_delta=0):
+        self.rounds = rounds
+        self.wins = wins
+        self.total_delta = total_delta
+        self.total_sq_delta = total_sq_delta
+
+    def record(self, won, delta):
+        """Record the outcome of one round"""
+        self.rounds += 1
+        if won:
+            self.wins += 1
+        self.total_delta += delta
+        self.total_sq_delta += delta * delta
+
+    def merge(self, other):
+        """Add the totals of another StrategyStats"""
+        self.rounds += other.rounds
+        self.wins += other.wins
+        self.total_delta += other.total_delta
+        self.total_sq_delta += other.total_sq_delta
+
+    @property
+    def win_rate(self):
+        return self.wins / self.rounds if self.rounds else 0.0
+
+    @property
+    def average_delta(self):
+        return self.total_delta / self.rounds if self.rounds else 0.0
+
+    @property
+    def variance(self):
+        if not self.rounds:
+            return 0.0
+        mean = self.total_delta / self.rounds
+        return self.total_sq_delta / self.rounds - mean * mean
+
+    def to_dict(self):
+        return {
+            "rounds": self.rounds,
+            "wins": self.wins,
+            "win_rate": self.win_rate,
+            "average_delta": self.average_delta,
+            "variance": self.variance
+        }
+
+
+class SimulationResult:
+    def __init__(self, stats, rounds, elapsed):
+        self.stats = stats  # strategy name -> StrategyStats
+        self.rounds = rounds
+        self.elapsed = elapsed
+
+    @property
+    def rounds_per_second(self):
+        return self.rounds / self.elapsed if self.elapsed else 0.0
+
+
+class Simulator:
+    """Plays complete rounds of Game between bots, without pygame or delays"""
+
+    def __init__(self, strategies, bet=100, starting_balance=1000, num_decks=1, penetration=0.75, seed=None):
+        if len(strategies) < 2:
+            raise ValueError("Need at least 2 strategies to play")
+        self.bet = bet
+        self.starting_balance = starting_balance
+        self.game = Game(num_decks=num_decks, penetration=penetration, seed=seed, record_actions=False)
+        self.strategy_names = {}
+        self.strategies = {}
+        self.stats = {}
+        self.rounds_played = 0
+
+        for i, name in enumerate(strategies):
+            player = Player(f"Bot {i + 1} ({name})", starting_balance, f"bot-{i + 1}")
+            player.strategy = name
+            if i == 0:
+                self.game.initialize_game(player)
+            else:
+                self.game.add_player(player)
+            self.strategy_names[player.player_id] = name
+            self.strategies[player.player_id] = get_strategy(name)
+            self.stats.setdefault(name, StrategyStats())
+
+    def play_round(self):
+        """Play one full round: bets, player turns and settlement"""
+        game = self.game
+        players = game.state_manager.players
+
+        if self.rounds_played == 0:
+            game.start_game()
+        else:
+            game.start_new_round()
+
+        # Bots that went broke buy back in so the table keeps going
+        balances = []
+        for player in players:
+            if player.balance < self.bet:
+                game.set_player_balance(player.player_id, self.starting_balance)
+            balances.append(player.balance)
+
+        for player in players:
+            game.place_bet(player.player_id, self.bet)
+
+        state_manager = game.state_manager
+        while state_manager.state == GameState.PLAYER_TURN:
+            player = state_manager.get_current_player()
+            if player.can_hit() and self.strategies[player.player_id].should_hit(player, game):
+                game.hit(player.player_id)
+            else:
+                game.stand(player.player_id)
+
+        for player, balance in zip(players, balances):
+            delta = player.balance - balance
+            self.stats[self.strategy_names[player.player_id]].record(delta > 0, delta)
+
+        self.rounds_played += 1
+
+    def run(self, rounds):
+        """Play the given number of rounds and return a SimulationResult"""
+        start = time.perf_counter()
+        for _ in range(rounds):
+            self.play_round()
+        return SimulationResult(self.stats, rounds, time.perf_counter() - start)
+
+
+def main():
+    """Run a headless simulation from the command line"""
+    parser = argparse.ArgumentParser(description="Headless Blackjack bot simulation")
+    parser.add_argument("--rounds", type=int, default=100000, help="Number of rounds to play")
+    parser.add_argument("--strategies", nargs="+", default=["conservative", "default", "aggressive"],
+                        help="Strategy of each seat")
+    parser.add_argument("--decks", type=int, default=1, help="Number of decks in the shoe")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the shoe shuffles")
+    args = parser.parse_args()
+
+    simulator = Simulator(args.strategies, num_decks=args.decks, seed=args.seed)
+    result = simulator.run(args.rounds)
+
+    print(f"{result.rounds} rounds in {result.elapsed:.2f}s ({result.rounds_per_second:.0f} rounds/s)")
+    for name, stats in result.stats.items():
+        print(f"{name}: win rate {stats.win_rate:.4f}, average delta {stats.average_delta:.2f}, "
+              f"variance {stats.variance:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,21 +17,40 @@ class GameStateManager:
         self.dealer_index = -1  # Host is dealer
         self.min_bet = 10
         self.max_bet = 500
+        self.player_index = {}  # player_id -> index in self.players
+        self.active_player_ids = set()  # Players still to act this round
 
     def add_player(self, player):
         """Add a player to the game"""
+        index = len(self.players)
         self.players.append(player)
-        return len(self.players) - 1  # Return player index
+        self.player_index[player.player_id] = index
+        return index  # Return player index
 
     def remove_player(self, player_id):
         """Remove a player from the game"""
-        for i, player in enumerate(self.players):
-            if player.player_id == player_id:
-                self.players.pop(i)
-                if i < self.current_player_index:
-                    self.current_player_index -= 1
-                return True
-        return False
+        index = self.player_index.pop(player_id, None)
+        if index is None:
+            return False
+
+        self.players.pop(index)
+        self.active_player_ids.discard(player_id)
+        # Players after the removed one move down a seat
+        for i in range(index, len(self.players)):
+            moved_id = self.players[i].player_id
+            self.player_index[moved_id] = i
+        if index < self.current_player_index:
+            self.current_player_index -= 1
+        return True
+
+    def get_player(self, player_id):
+        """Return the player with the given ID, or None"""
+        index = self.player_index.get(player_id)
+        return self.players[index] if index is not None else None
+
+    def get_player_index(self, player_id):
+        """Return the seat index of the player with the given ID, or None"""
+        return self.player_index.get(player_id)
 
     def start_new_round(self):
         """Start a new round of the game"""
@@ -62,6 +81,7 @@ class GameStateManager:
         self.state = GameState.PLAYER_TURN
         # Make sure we start with the first player
         self.current_player_index = 0
+        self.active_player_ids = {player.player_id for player in self.players if player.can_hit()}
         return True
 
     def next_player(self):
@@ -69,6 +89,10 @@ class GameStateManager:
         if self.state != GameState.PLAYER_TURN:
             return False
 
+        current_player = self.get_current_player()
+        if current_player:
+            self.active_player_ids.discard(current_player.player_id)
+
         self.current_player_index = (self.current_player_index + 1) % len(self.players)
 
         # If we've gone through all players, end the game
@@ -76,8 +100,8 @@ class GameStateManager:
             return False
 
         # Skip players who are busted or standing
-        while (self.current_player_index < len(self.players) and 
-               not self.players[self.current_player_index].can_hit()):
+        while (self.current_player_index < len(self.players) and
+               self.players[self.current_player_index].player_id not in self.active_player_ids):
             self.current_player_index += 1
             if self.current_player_index >= len(self.players):
                 return False
@@ -0,0 +1,80 @@
+import argparse
+import multiprocessing
+import os
+import time
+from shared.game_logic.simulator import Simulator, SimulationResult, StrategyStats
+
+
+def shard_seed(seed, shard_index):
+    """Return the RNG seed of one shard; independent of how shards are scheduled"""
+    return f"{seed}:{shard_index}"
+
+
+def _run_shard(task):
+    """Play one shard of rounds in a worker process"""
+    strategies, rounds, seed, options = task
+    simulator = Simulator(strategies, seed=seed, **options)
+    result = simulator.run(rounds)
+    return {
+        name: (stats.rounds, stats.wins, stats.total_delta, stats.total_sq_delta)
+        for name, stats in result.stats.items()
+    }
+
+
+def run_tournament(strategies, rounds, workers=None, seed=0, shard_size=10000, **options):
+    """Play rounds between strategies across a pool of worker processes
+
+    Rounds are split into fixed shards of shard_size, each with its own
+    seeded shuffle stream, so the merged result for a given seed does not
+    depend on the number of workers. Extra options go to Simulator.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tasks = []
+    for shard_index, start in enumerate(range(0, rounds, shard_size)):
+        shard_rounds = min(shard_size, rounds - start)
+        tasks.append((list(strategies), shard_rounds, shard_seed(seed, shard_index), options))
+
+    stats = {name: StrategyStats() for name in strategies}
+    started = time.perf_counter()
+
+    if workers <= 1 or len(tasks) <= 1:
+        for shard_stats in map(_run_shard, tasks):
+            _merge(stats, shard_stats)
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            for shard_stats in pool.imap(_run_shard, tasks):
+                _merge(stats, shard_stats)
+
+    return SimulationResult(stats, rounds, time.perf_counter() - started)
+
+
+def _merge(stats, shard_stats):
+    for name, totals in shard_stats.items():
+        stats[name].merge(StrategyStats(*totals))
+
+
+def main():
+    """Run a multi-process strategy tournament from the command line"""
+    parser = argparse.ArgumentParser(description="Blackjack bot strategy tournament")
+    parser.add_argument("--rounds", type=int, default=1000000, help="Total number of rounds")
+    parser.add_argument("--strategies", nargs="+", default=["conservative", "default", "aggressive"],
+                        help="Strategy of each seat")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=10000, help="Rounds per shard")
+    parser.add_argument("--decks", type=int, default=1, help="Number of decks in the shoe")
+    parser.add_argument("--seed", type=int, default=0, help="Tournament seed")
+    args = parser.parse_args()
+
+    result = run_tournament(args.strategies, args.rounds, workers=args.workers, seed=args.seed,
+                            shard_size=args.shard_size, num_decks=args.decks)
+
+    print(f"{result.rounds} rounds in {result.elapsed:.2f}s ({result.rounds_per_second:.0f} rounds/s)")
+    for name, stats in result.stats.items():
+        print(f"{name}: win rate {stats.win_rate:.4f}, average delta {stats.average_delta:.2f}, "
+              f"variance {stats.variance:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,16 +35,103 @@ class Values(Enum):
             return str(self.value)
 
 
+SUIT_COUNT = len(Suits)
+VALUE_COUNT = len(Values)
+CARD_COUNT = SUIT_COUNT * VALUE_COUNT
+
+# Blackjack value of every card code (aces count as 1)
+BLACKJACK_VALUES = tuple(min(code % VALUE_COUNT + 1, 10) for code in range(CARD_COUNT))
+
+
+def card_code(suit, value):
+    """Return the 0-51 code of a suit/value pair (enums or ints)"""
+    suit = suit.value if isinstance(suit, Suits) else suit
+    value = value.value if isinstance(value, Values) else value
+    if not 1 <= suit <= SUIT_COUNT:
+        raise ValueError(f"{suit!r} is not a valid suit")
+    if not 1 <= value <= VALUE_COUNT:
+        raise ValueError(f"{value!r} is not a valid card value")
+    return (suit - 1) * VALUE_COUNT + (value - 1)
+
+
 class Card:
-    def __init__(self, suit, value):
-        self.suit = Suits(suit) if isinstance(suit, int) else suit
-        self.value = Values(value) if isinstance(value, int) else value
+    """Immutable playing card.
+
+    There are exactly 52 instances, built once at import time. Constructing a
+    Card returns the interned instance for that suit/value, so cards can be
+    compared by identity and cost no allocation.
+    """
+
+    __slots__ = ("suit", "value", "code", "points", "_wire", "_wire_int")
+
+    def __new__(cls, suit, value):
+        return CARDS[card_code(suit, value)]
+
+    @classmethod
+    def _create(cls, code):
+        card = object.__new__(cls)
+        suit = Suits(code // VALUE_COUNT + 1)
+        value = Values(code % VALUE_COUNT + 1)
+        object.__setattr__(card, "suit", suit)
+        object.__setattr__(card, "value", value)
+        object.__setattr__(card, "code", code)
+        object.__setattr__(card, "points", BLACKJACK_VALUES[code])
+        object.__setattr__(card, "_wire", (suit.name, value.name))
+        object.__setattr__(card, "_wire_int", (suit.value, value.value))
+        return card
+
+    @staticmethod
+    def from_code(code):
+        """Return the card with the given 0-51 code"""
+        if not 0 <= code < CARD_COUNT:
+            raise ValueError(f"{code!r} is not a valid card code")
+        return CARDS[code]
+
+    @staticmethod
+    def from_dict(card_dict):
+        """Return the card described by a {"suit", "value"} dict (names or ints)"""
+        return _CARDS_BY_WIRE[(card_dict["suit"], card_dict["value"])]
+
+    def to_dict(self):
+        """Return the {"suit", "value"} dict used in game states"""
+        suit, value = self._wire
+        return {"suit": suit, "value": value}
+
+    def to_int_dict(self):
+        """Return the {"suit", "value"} dict with enum values as ints"""
+        suit, value = self._wire_int
+        return {"suit": suit, "value": value}
 
     def get_value(self):
         """Returns the blackjack value of the card"""
-        if self.value.value >= 10:
-            return 10
-        return self.value.value
+        return self.points
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __reduce__(self):
+        return Card.from_code, (self.code,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"Card({self.suit.name}, {self.value.name})"
 
     def __str__(self):
-        return f"{self.value} of {self.suit}"
\ No newline at end of file
+        return f"{self.value} of {self.suit}"
+
+
+CARDS = tuple(Card._create(code) for code in range(CARD_COUNT))
+
+_CARDS_BY_WIRE = {}
+for _card in CARDS:
+    _CARDS_BY_WIRE[_card._wire] = _card
+    _CARDS_BY_WIRE[_card._wire_int] = _card
+del _card
@@ -1,21 +1,78 @@
-from shared.models.deck import Deck
+from shared.models.card import CARDS
+from shared.models.shoe import Shoe
+from shared.models.player import Player
+from shared.models.snapshot import FrozenDict
+from shared.models.message_log import MessageLog
+from shared.game_logic.journal import EventJournal, EventType, GameEvent, ACTION_EVENTS
 from shared.game_logic.state_manager import GameStateManager, GameState
 from shared.game_logic.rules import RulesEngine
 from shared.game_logic.bet_manager import BetManager
+import random
 import uuid
 
+# Cards a round may need per player; the shoe is reshuffled early if fewer remain
+CARDS_RESERVED_PER_PLAYER = 6
+
+# Sections of the game state snapshot that are rebuilt independently
+STATE_SECTIONS = ("players", "hands", "messages")
+
+# Number of recent messages included in the game state
+STATE_MESSAGE_COUNT = 5
+
+# Number of messages kept for the UI
+MESSAGE_LOG_CAPACITY = 50
+
+# Shared, immutable wire form of every card, indexed by card code
+_CARD_STATES = tuple(FrozenDict(card.to_dict()) for card in CARDS)
+
+
 class Game:
-    def __init__(self, game_id=None):
+    def __init__(self, game_id=None, num_decks=1, penetration=0.75, seed=None, record_actions=True,
+                 journal=None):
         self.game_id = game_id if game_id else str(uuid.uuid4())
-        self.deck = Deck()
+        # Every shuffle comes from this stream, so the seed and the journaled
+        # actions reproduce the whole game
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        self.rng = random.Random(self.seed)
+        self.deck = Shoe(num_decks, penetration, rng=self.rng)
         self.state_manager = GameStateManager()
         self.rules = RulesEngine()
         self.bet_manager = BetManager()
         self.host_player_id = None
-        self.messages = []
+        self.messages = MessageLog(MESSAGE_LOG_CAPACITY)
+        self.record_actions = record_actions
+        self.journal = journal if journal is not None else EventJournal()
+
+        # Cached get_game_state() snapshot and the sections it was built from
+        self.state_version = 0
+        self._dirty = set(STATE_SECTIONS)
+        self._snapshot = None
+        self._table_key = None
+        self._messages_key = None
+        self._player_states = ()
+        self._hand_states = ()
+        self._players_section = ()
+        self._messages_section = ()
+        self._metadata = FrozenDict({
+            "seed": self.seed,
+            "num_decks": self.deck.num_decks,
+            "penetration": self.deck.penetration
+        })
+
+    def mark_dirty(self, *sections):
+        """Flag snapshot sections (default: all) as changed outside the Game API"""
+        self._dirty.update(sections or STATE_SECTIONS)
+
+    def _record(self, event_type, player_id=None, **data):
+        """Append an event to the journal"""
+        if self.record_actions:
+            self.journal.append(event_type, player_id, **data)
 
     def initialize_game(self, host_player):
         """Initialize a new game with a host player"""
+        self._record(EventType.INITIALIZE_GAME, host_player.player_id, name=host_player.name,
+                     balance=host_player.balance)
+        self.mark_dirty("players", "hands")
         self.host_player_id = host_player.player_id
         host_player.is_host = True
         self.state_manager.add_player(host_player)
@@ -26,21 +83,25 @@ class Game:
         if self.state_manager.state != GameState.WAITING_FOR_PLAYERS:
             return False, "Cannot add players after game has started"
 
+        self._record(EventType.ADD_PLAYER, player.player_id, name=player.name, balance=player.balance)
+        self.mark_dirty("players", "hands")
         player_index = self.state_manager.add_player(player)
         return True, player_index
 
     def start_game(self):
         """Start the game once all players have joined"""
+        self._record(EventType.START_GAME)
         if len(self.state_manager.players) < 2:
             return False, "Need at least 2 players to start"
 
-        self.deck.init()
         self.deck.shuffle()
         self.state_manager.start_new_round()
+        self.mark_dirty("players", "hands")
         return True, "Game started successfully"
 
     def place_bet(self, player_id, amount):
         """Place a bet for the specified player"""
+        self._record(EventType.PLACE_BET, player_id, amount=amount)
         if self.state_manager.state != GameState.BETTING:
             return False, "Not in betting phase"
 
@@ -49,6 +110,7 @@ class Game:
             return False, "Player not found"
 
         success, message = self.bet_manager.place_bet(player, amount)
+        self.mark_dirty("players")
 
         # Check if all players have bet
         all_bet = all(player.current_bet > 0 for player in self.state_manager.players)
@@ -60,10 +122,13 @@ class Game:
 
     def _find_player_by_id(self, player_id):
         """Find a player by their ID"""
-        for player in self.state_manager.players:
-            if player.player_id == player_id:
-                return player
-        return None
+        return self.state_manager.get_player(player_id)
+
+    def remove_player(self, player_id):
+        """Remove a player from the game"""
+        self._record(EventType.REMOVE_PLAYER, player_id)
+        self.mark_dirty("players", "hands")
+        return self.state_manager.remove_player(player_id)
 
     def _deal_initial_cards(self):
         """Deal the initial 2 cards to each player"""
@@ -74,24 +139,20 @@ class Game:
         for _ in range(2):
             for player in self.state_manager.players:
                 card = self.deck.draw()
+                # Players must not get 21 with the initial cards: redraw
+                while card and player.hand.would_be_21(card):
+                    self.deck.return_card(card)
+                    card = self.deck.draw()
                 if card:
                     player.hand.add_card(card)
-                    # Check if player got 21 with initial cards (should not happen)
-                    if player.hand.get_value() == 21:
-                        # Redraw the second card
-                        self.deck.return_card(card)
-                        new_card = self.deck.draw()
-                        while new_card and player.hand.would_be_21(new_card):
-                            self.deck.return_card(new_card)
-                            new_card = self.deck.draw()
-                        if new_card:
-                            player.hand.cards[-1] = new_card
 
+        self.mark_dirty("hands")
         self.state_manager.start_player_turns()
         return True
 
     def hit(self, player_id):
         """Player requests another card"""
+        self._record(EventType.HIT, player_id)
         if self.state_manager.state != GameState.PLAYER_TURN:
             return False, "Not in player turn phase"
 
@@ -107,6 +168,7 @@ class Game:
             return False, "No cards left in deck"
 
         current_player.hand.add_card(card)
+        self.mark_dirty("hands")
 
         # Check for bust or 21
         if current_player.hand.is_busted:
@@ -120,6 +182,7 @@ class Game:
 
     def stand(self, player_id):
         """Player chooses to stand (no more cards)"""
+        self._record(EventType.STAND, player_id)
         if self.state_manager.state != GameState.PLAYER_TURN:
             return False, "Not in player turn phase"
 
@@ -141,23 +204,31 @@ class Game:
         """End the current round and determine winners"""
         winners, best_score = self.state_manager.find_winner()
 
+        # Calcular o prêmio (soma de todas as apostas), dividido entre os vencedores
+        total_pot = sum(p.current_bet for p in self.state_manager.players)
+        prize, remainder = divmod(total_pot, len(winners)) if winners else (0, 0)
+
         # Process wins/losses
         for player in self.state_manager.players:
             if player in winners:
-                # Calcular o prêmio (soma de todas as apostas)
-                total_pot = sum(p.current_bet for p in self.state_manager.players)
                 # Atualizar o saldo do vencedor
-                player.win(total_pot)
-                self.messages.append(f"{player.name} ganhou com {player.hand.get_value()} pontos! (Ganhou {total_pot} moedas)")
+                player_prize = prize + remainder if player is winners[0] else prize
+                player.win(player_prize)
+                self.messages.append(f"{player.name} ganhou com {player.hand.get_value()} pontos! (Ganhou {player_prize} moedas)")
             else:
                 player.lose()
                 self.messages.append(f"{player.name} perdeu com {player.hand.get_value()} pontos.")
 
+        self._record(EventType.ROUND_ENDED, winners=[player.player_id for player in winners],
+                     best_score=best_score, pot=total_pot)
+        self.mark_dirty("players")
         self.state_manager.state = GameState.GAME_OVER
         return winners
 
     def start_new_round(self):
         """Start a new round of the game"""
+        self._record(EventType.START_NEW_ROUND)
+        self.mark_dirty("players", "hands")
         # Reset all player hands
         for player in self.state_manager.players:
             player.reset_hand()
@@ -165,9 +236,10 @@ class Game:
         # Clear bets
         self.bet_manager.clear_bets()
 
-        # Get a fresh shuffled deck
-        self.deck.init()
-        self.deck.shuffle()
+        # Reshuffle only once the cut card is reached
+        reserve = CARDS_RESERVED_PER_PLAYER * len(self.state_manager.players)
+        if self.deck.needs_shuffle(reserve):
+            self.deck.shuffle()
 
         # Rotate dealer position for fairness
         self.state_manager.dealer_index = (self.state_manager.dealer_index + 1) % len(self.state_manager.players)
@@ -181,26 +253,131 @@ class Game:
         else:
             return False, "Failed to start new round"
 
-    def get_game_state(self):
-        """Get the current state of the game for serialization"""
+    def set_player_balance(self, player_id, balance):
+        """Set a player's balance from outside the game (e.g. a rebuy)"""
+        player = self._find_player_by_id(player_id)
+        if not player:
+            return False
+        self._record(EventType.SET_PLAYER_BALANCE, player_id, balance=balance)
+        player.balance = balance
+        self.mark_dirty("players")
+        return True
+
+    def get_replay(self, events=None):
+        """Return everything needed to replay this game with Game.replay()
+
+        Uses the journal's in-memory events unless a full event list (e.g.
+        loaded back from a journal sink after flush()) is given. "complete"
+        is False when the events are missing any the journal has recorded:
+        older ones rotated out, or a sink's file without the unflushed tail.
+        """
+        if events is None:
+            events = list(self.journal.events())
+            complete = self.journal.is_complete
+        else:
+            events = list(events)
+            complete = [event.seq for event in events] == list(range(self.journal.next_seq))
         return {
             "game_id": self.game_id,
-            "state": self.state_manager.state.name,
-            "current_player_index": self.state_manager.current_player_index,
-            "players": [
+            "seed": self.seed,
+            "num_decks": self.deck.num_decks,
+            "penetration": self.deck.penetration,
+            "complete": complete,
+            "actions": [event.to_dict() for event in events if event.event_type in ACTION_EVENTS]
+        }
+
+    @classmethod
+    def replay(cls, record):
+        """Re-execute a recorded game and return the resulting Game
+
+        The seed reproduces every shuffle, so the replayed game deals the
+        same cards and reaches the same outcomes as the original.
+        """
+        if not record.get("complete", True):
+            raise ValueError("Replay record is missing events rotated out of the journal")
+
+        game = cls(record["game_id"], record["num_decks"], record["penetration"], record["seed"])
+        for event_dict in record["actions"]:
+            event = GameEvent.from_dict(event_dict)
+            name, player_id, data = event.event_type, event.player_id, event.data
+            if name in (EventType.INITIALIZE_GAME, EventType.ADD_PLAYER):
+                getattr(game, name)(Player(data["name"], data["balance"], player_id))
+            elif name in (EventType.START_GAME, EventType.START_NEW_ROUND):
+                getattr(game, name)()
+            elif name == EventType.PLACE_BET:
+                game.place_bet(player_id, data["amount"])
+            elif name in (EventType.HIT, EventType.STAND, EventType.REMOVE_PLAYER):
+                getattr(game, name)(player_id)
+            elif name == EventType.SET_PLAYER_BALANCE:
+                game.set_player_balance(player_id, data["balance"])
+            elif name not in ACTION_EVENTS:
+                continue
+            else:
+                raise ValueError(f"Unknown action in replay: {name}")
+        return game
+
+    def get_game_state(self):
+        """Get the current state of the game for serialization
+
+        Returns an immutable snapshot that is cached until the game changes.
+        Only the sections that changed since the last call are rebuilt, and
+        every rebuild gets a new, higher "version".
+        """
+        state_manager = self.state_manager
+        dirty = self._dirty
+
+        # Turn order and shoe position are cheap to compare on every call
+        table_key = (state_manager.state, state_manager.current_player_index,
+                     state_manager.dealer_index, self.deck.cursor)
+        messages_key = self.messages.version
+        if messages_key != self._messages_key:
+            dirty.add("messages")
+
+        if self._snapshot is not None and not dirty and table_key == self._table_key:
+            return self._snapshot
+
+        players = state_manager.players
+        if "players" in dirty:
+            self._player_states = [
                 {
                     "id": player.player_id,
                     "name": player.name,
                     "balance": player.balance,
                     "current_bet": player.current_bet,
-                    "is_host": player.is_host,
+                    "is_host": player.is_host
+                }
+                for player in players
+            ]
+        if "hands" in dirty:
+            self._hand_states = [
+                {
                     "hand_value": player.hand.get_value() if player.hand else 0,
                     "is_busted": player.hand.is_busted if player.hand else False,
-                    "hand": [{"suit": card.suit.name, "value": card.value.name} for card in player.hand.cards]
+                    "hand": tuple(_CARD_STATES[card.code] for card in player.hand.cards)
                 }
-                for player in self.state_manager.players
-            ],
-            "dealer_index": self.state_manager.dealer_index,
+                for player in players
+            ]
+        if "players" in dirty or "hands" in dirty:
+            self._players_section = tuple(
+                FrozenDict(player_state, **hand_state)
+                for player_state, hand_state in zip(self._player_states, self._hand_states)
+            )
+        if "messages" in dirty:
+            self._messages_section = tuple(self.messages.tail(STATE_MESSAGE_COUNT))
+            self._messages_key = messages_key
+
+        self.state_version += 1
+        self._table_key = table_key
+        dirty.clear()
+        self._snapshot = FrozenDict({
+            "game_id": self.game_id,
+            "version": self.state_version,
+            "state": state_manager.state.name,
+            "current_player_index": state_manager.current_player_index,
+            "players": self._players_section,
+            "dealer_index": state_manager.dealer_index,
             "cards_remaining": self.deck.cards_remaining(),
-            "messages": self.messages[-5:]  # Last 5 messages
-        }
\ No newline at end of file
+            "metadata": self._metadata,
+            "messages": self._messages_section  # Last 5 messages
+        })
+        return self._snapshot
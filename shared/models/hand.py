@@ -1,37 +1,63 @@
+# Best value of a hand indexed by [hard_total][has_ace]: one ace counts as 11
+# whenever that does not bust the hand
+MAX_TABLE_TOTAL = 64
+BEST_VALUE = tuple(
+    (hard, hard + 10 if hard + 10 <= 21 else hard)
+    for hard in range(MAX_TABLE_TOTAL)
+)
+
+
+def best_value(hard_total, aces):
+    """Return the best blackjack value for a hard total and ace count"""
+    if hard_total < MAX_TABLE_TOTAL:
+        return BEST_VALUE[hard_total][aces > 0]
+    return hard_total
+
+
 class Hand:
     def __init__(self):
         self.cards = []
         self.is_active = True
         self.is_busted = False
+        self.hard_total = 0
+        self.aces = 0
+        self.value = 0
 
     def add_card(self, card):
         """Add a card to the hand"""
         self.cards.append(card)
-        if self.get_value() > 21:
-            self.is_busted = True
+        points = card.points
+        self.hard_total += points
+        if points == 1:
+            self.aces += 1
+        self.value = best_value(self.hard_total, self.aces)
+        self.is_busted = self.value > 21
+        if self.is_busted:
             self.is_active = False
 
+    @property
+    def is_soft(self):
+        """True when an ace is currently counted as 11"""
+        return self.value != self.hard_total
+
     def would_be_21(self, card):
         """Check if adding this card would result in 21"""
-        total = self.get_value() + card.get_value()
-        return total == 21
+        aces = self.aces + (card.points == 1)
+        return best_value(self.hard_total + card.points, aces) == 21
 
     def get_value(self):
-        """Calculate the total value of the hand"""
-        total = 0
-
-        # Sum up all cards, with Aces worth 1
-        for card in self.cards:
-            total += card.get_value()
-
-        return total
+        """Return the total value of the hand"""
+        return self.value
 
     def clear(self):
         """Clear all cards from the hand"""
         self.cards.clear()
         self.is_active = True
         self.is_busted = False
+        self.hard_total = 0
+        self.aces = 0
+        self.value = 0
 
     def __str__(self):
         """String representation of the hand"""
-        return ", ".join(str(card) for card in self.cards) + f" (Total: {self.get_value()})"
\ No newline at end of file
+        return ", ".join(str(card) for card in self.cards) + f" (Total: {self.get_value()})"
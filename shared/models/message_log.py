@@ -0,0 +1,56 @@
+from collections import deque
+
+
+class MessageLog:
+    """Bounded log of the most recent game messages shown to players.
+
+    Behaves like a list for appends, iteration, len() and indexing, but
+    only keeps the last ``capacity`` messages. ``total`` counts every
+    message ever appended and ``version`` changes whenever the contents
+    do, appends and clears alike, so callers can tell when the log changed.
+    """
+
+    def __init__(self, capacity=50):
+        self._messages = deque(maxlen=capacity)
+        self.total = 0
+        self.version = 0
+
+    @property
+    def capacity(self):
+        return self._messages.maxlen
+
+    def append(self, message):
+        """Add a message, dropping the oldest one when full"""
+        self._messages.append(message)
+        self.total += 1
+        self.version += 1
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def tail(self, count):
+        """Return the last count messages, oldest first"""
+        if count <= 0:
+            return []
+        messages = self._messages
+        start = max(len(messages) - count, 0)
+        return [messages[i] for i in range(start, len(messages))]
+
+    def clear(self):
+        self._messages.clear()
+        self.version += 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._messages)[index]
+        return self._messages[index]
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __bool__(self):
+        return bool(self._messages)
@@ -0,0 +1,121 @@
+import random
+from shared.models.card import CARDS, CARD_COUNT
+
+# Number of blackjack ranks by value: ace (1) through ten-valued cards (10)
+RANK_COUNT = 10
+
+# Cards of each blackjack value in one deck, indexed by value - 1
+RANKS_PER_DECK = tuple(sum(1 for card in CARDS if card.points == points) for points in range(1, RANK_COUNT + 1))
+
+# Hi-Lo count tag of each blackjack value, indexed by value
+HI_LO = (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1)
+
+
+class Shoe:
+    """One or more decks dealt from a fixed array with a moving cursor.
+
+    Cards before the cursor have been dealt, cards from the cursor on are
+    still in the shoe. The cut card sits at ``penetration`` of the shoe and
+    marks when the next round should start from a fresh shuffle.
+    """
+
+    def __init__(self, num_decks=1, penetration=0.75, rng=None):
+        if num_decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 <= penetration <= 1:
+            raise ValueError("Penetration must be between 0 and 1")
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else random
+        self.cards = list(CARDS) * num_decks
+        self.size = len(self.cards)
+        self.cut_card = int(self.size * penetration)
+        self.cursor = 0
+        self.rank_counts = [count * num_decks for count in RANKS_PER_DECK]
+        self.running_count = 0
+
+    def init(self):
+        """Put every dealt card back into the shoe, in the current order"""
+        self.cursor = 0
+        self._reset_counts()
+
+    def shuffle(self):
+        """Collect all cards and shuffle the whole shoe"""
+        self.rng.shuffle(self.cards)
+        self.cursor = 0
+        self._reset_counts()
+
+    def _reset_counts(self):
+        counts = self.rank_counts
+        for i, count in enumerate(RANKS_PER_DECK):
+            counts[i] = count * self.num_decks
+        self.running_count = 0
+
+    def needs_shuffle(self, reserve=0):
+        """True when the cut card was reached or fewer than reserve cards remain"""
+        return self.cursor >= self.cut_card or self.size - self.cursor < reserve
+
+    def draw(self):
+        """Draw the next card from the shoe"""
+        if self.cursor >= self.size:
+            return None
+        card = self.cards[self.cursor]
+        self.cursor += 1
+        points = card.points
+        self.rank_counts[points - 1] -= 1
+        self.running_count += HI_LO[points]
+        return card
+
+    def return_card(self, card):
+        """Put a dealt card back at a random position among the undealt cards"""
+        cards = self.cards
+        slot = self.cursor - 1
+        # The returned card is normally the one just drawn
+        while slot >= 0 and cards[slot] is not card:
+            slot -= 1
+        if slot < 0:
+            raise ValueError(f"{card} was not dealt from this shoe")
+        self.cursor -= 1
+        cursor = self.cursor
+        cards[slot], cards[cursor] = cards[cursor], cards[slot]
+        target = self.rng.randrange(cursor, self.size)
+        cards[cursor], cards[target] = cards[target], cards[cursor]
+        points = card.points
+        self.rank_counts[points - 1] += 1
+        self.running_count -= HI_LO[points]
+
+    def cards_remaining(self):
+        """Return the number of cards left in the shoe"""
+        return self.size - self.cursor
+
+    def next_card_distribution(self):
+        """Return the probability of each blackjack value (1-10) being drawn next"""
+        remaining = self.size - self.cursor
+        if not remaining:
+            return [0.0] * RANK_COUNT
+        return [count / remaining for count in self.rank_counts]
+
+    def bust_probability(self, hand):
+        """Return the probability that the next card busts the given hand"""
+        remaining = self.size - self.cursor
+        if not remaining:
+            return 0.0
+        # The hard total is the lowest value a hand can take, so a card busts
+        # exactly when it pushes the hard total past 21
+        safe = 21 - hand.hard_total
+        if safe <= 0:
+            return 1.0
+        if safe >= RANK_COUNT:
+            return 0.0
+        return sum(self.rank_counts[safe:]) / remaining
+
+    def decks_remaining(self):
+        """Return the number of decks left in the shoe"""
+        return (self.size - self.cursor) / CARD_COUNT
+
+    def true_count(self):
+        """Return the Hi-Lo running count per remaining deck"""
+        decks = self.decks_remaining()
+        if not decks:
+            return 0.0
+        return self.running_count / decks
@@ -0,0 +1,27 @@
+class FrozenDict(dict):
+    """A dict that cannot be modified after creation.
+
+    Used for cached game-state snapshots, which are shared between callers.
+    It still serializes with json like a plain dict; copy() returns a
+    mutable dict.
+    """
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Game state snapshots are immutable; use copy() to get a mutable dict")
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+    __ior__ = _immutable
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
@@ -0,0 +1,319 @@
+import struct
+import uuid
+from shared.models.card import Card, Suits, Values, CARDS
+from shared.game_logic.state_manager import GameState
+from shared.network.message import Message, MessageType, ActionType
+
+JSON_CODEC = "json"
+BINARY_CODEC = "binary-v2"
+
+# Codecs this peer can speak, most preferred first
+SUPPORTED_CODECS = (BINARY_CODEC, JSON_CODEC)
+
+# First byte of every binary payload; JSON payloads always start with "{"
+BINARY_MAGIC = 0xB1
+BINARY_VERSION = 2
+
+# magic, version, flags, message type, timestamp (ms)
+BINARY_HEADER = struct.Struct("!BBBBq")
+FLOAT = struct.Struct("!d")
+
+# Header flags
+FLAG_SENDER_UUID = 0x01
+FLAG_MESSAGE_UUID = 0x02
+FLAG_CUSTOM_TYPE = 0x04
+
+# Value tags
+TAG_NONE = 0
+TAG_TRUE = 1
+TAG_FALSE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_INTERNED = 6
+TAG_LIST = 7
+TAG_DICT = 8
+TAG_CARD = 9  # {"suit": "HEARTS", "value": "ACE"}
+TAG_CARD_INT = 10  # {"suit": 1, "value": 1}
+
+
+# Strings sent as a one-byte index. Only ever append to this table, and bump
+# BINARY_VERSION (and the codec name) when doing so: an older peer cannot
+# decode the new indices, and the new name makes it fall back to JSON.
+INTERNED_STRINGS = tuple(dict.fromkeys([
+    # Message and action types
+    MessageType.JOIN_REQUEST, MessageType.JOIN_RESPONSE, MessageType.GAME_STATE,
+    MessageType.PLAYER_ACTION, MessageType.CHAT, MessageType.DISCONNECT,
+    ActionType.HIT, ActionType.STAND, ActionType.PLACE_BET, ActionType.START_GAME, ActionType.NEW_ROUND,
+    # Player actions sent by the client
+    "action", "amount", "HIT", "STAND", "PLACE_BET",
+    # Message contents
+    "player_id", "player_name", "balance", "accepted", "reason", "action_type",
+    "action_data", "text", "leaving", "codecs", "codec",
+    # Game states
+    "game_id", "version", "state", "current_player_index", "players", "dealer_index",
+    "cards_remaining", "metadata", "messages", "seed", "num_decks", "penetration",
+    "id", "name", "current_bet", "is_host", "hand_value", "is_busted", "hand", "suit", "value",
+] + [state.name for state in GameState] + [suit.name for suit in Suits] + [value.name for value in Values] + [
+    # State deltas
+    MessageType.GAME_STATE_DELTA, MessageType.STATE_ACK,
+    "base", "delta", "resync", "s", "p", "d", "t", "a", "i", "r",
+    # Heartbeats
+    MessageType.PING, MessageType.PONG,
+]))
+_INTERNED_INDEX = {string: i for i, string in enumerate(INTERNED_STRINGS)}
+
+
+class JsonCodec:
+    """The original JSON encoding, understood by every peer"""
+
+    name = JSON_CODEC
+
+    def encode(self, message):
+        return message.to_json().encode('utf-8')
+
+    def decode(self, payload):
+        return Message.from_json(bytes(payload).decode('utf-8'))
+
+
+class BinaryCodec:
+    """Compact binary encoding of messages.
+
+    A struct-packed header carries the message type as an interned index
+    and the sender and message ids as 16 raw bytes when they are UUIDs. The
+    content is a tagged value tree: interned strings take one byte, ints are
+    zigzag varints and card dicts collapse to their 0-51 code. The decoded
+    message equals the one a JSON round trip would give.
+    """
+
+    name = BINARY_CODEC
+
+    def encode(self, message):
+        flags = 0
+        type_index = _INTERNED_INDEX.get(message.msg_type)
+        if type_index is None:
+            flags |= FLAG_CUSTOM_TYPE
+            type_index = 0
+        sender = _uuid_bytes(message.sender_id)
+        if sender is not None:
+            flags |= FLAG_SENDER_UUID
+        message_id = _uuid_bytes(message.message_id)
+        if message_id is not None:
+            flags |= FLAG_MESSAGE_UUID
+
+        out = bytearray(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, type_index, message.timestamp))
+        if flags & FLAG_CUSTOM_TYPE:
+            _write_value(out, message.msg_type)
+        if sender is not None:
+            out += sender
+        else:
+            _write_value(out, message.sender_id)
+        if message_id is not None:
+            out += message_id
+        else:
+            _write_value(out, message.message_id)
+        _write_value(out, message.content)
+        return bytes(out)
+
+    def decode(self, payload):
+        payload = bytes(payload)
+        magic, version, flags, type_index, timestamp = BINARY_HEADER.unpack_from(payload)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary message (magic {magic:#x}, version {version})")
+        pos = BINARY_HEADER.size
+        if flags & FLAG_CUSTOM_TYPE:
+            msg_type, pos = _read_value(payload, pos)
+        else:
+            msg_type = INTERNED_STRINGS[type_index]
+        if flags & FLAG_SENDER_UUID:
+            sender_id = str(uuid.UUID(bytes=payload[pos:pos + 16]))
+            pos += 16
+        else:
+            sender_id, pos = _read_value(payload, pos)
+        if flags & FLAG_MESSAGE_UUID:
+            message_id = str(uuid.UUID(bytes=payload[pos:pos + 16]))
+            pos += 16
+        else:
+            message_id, pos = _read_value(payload, pos)
+        content, pos = _read_value(payload, pos)
+        if pos != len(payload):
+            raise ValueError("Trailing bytes after binary message")
+        return Message(msg_type, sender_id, content, timestamp, message_id)
+
+
+def _uuid_bytes(value):
+    """Return the 16 bytes of a canonical UUID string, or None"""
+    if type(value) is not str or len(value) != 36:
+        return None
+    try:
+        parsed = uuid.UUID(value)
+    except ValueError:
+        return None
+    # Only compact ids that decode back to the exact same string
+    return parsed.bytes if str(parsed) == value else None
+
+
+def _write_varint(out, n):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_value(out, value):
+    kind = type(value)
+    if kind is str:
+        index = _INTERNED_INDEX.get(value)
+        if index is not None:
+            out.append(TAG_INTERNED)
+            out.append(index)
+        else:
+            data = value.encode('utf-8')
+            out.append(TAG_STR)
+            _write_varint(out, len(data))
+            out += data
+    elif kind is int:
+        out.append(TAG_INT)
+        _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif value is None:
+        out.append(TAG_NONE)
+    elif kind is bool:
+        out.append(TAG_TRUE if value else TAG_FALSE)
+    elif isinstance(value, dict):
+        if len(value) == 2:
+            suit = value.get("suit")
+            card_kind = type(suit)
+            if (card_kind is str or card_kind is int) and type(value.get("value")) is card_kind:
+                try:
+                    card = Card.from_dict(value)
+                except KeyError:
+                    card = None
+                if card is not None:
+                    out.append(TAG_CARD if card_kind is str else TAG_CARD_INT)
+                    out.append(card.code)
+                    return
+        out.append(TAG_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            if type(key) is not str:
+                raise TypeError(f"Dict keys must be strings, not {type(key).__name__}")
+            _write_value(out, key)
+            _write_value(out, item)
+    elif isinstance(value, (list, tuple)):
+        out.append(TAG_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+    elif kind is float:
+        out.append(TAG_FLOAT)
+        out += FLOAT.pack(value)
+    elif isinstance(value, str):
+        _write_value(out, str(value))
+    elif isinstance(value, int):
+        _write_value(out, int(value))
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} values")
+
+
+def _read_value(data, pos):
+    tag = data[pos]
+    if tag == TAG_INTERNED:
+        return INTERNED_STRINGS[data[pos + 1]], pos + 2
+    if tag == TAG_INT:
+        n = data[pos + 1]
+        if n < 0x80:
+            pos += 2
+        else:
+            n, pos = _read_varint(data, pos + 1)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if tag == TAG_CARD:
+        return CARDS[data[pos + 1]].to_dict(), pos + 2
+    if tag == TAG_DICT:
+        count = data[pos + 1]
+        if count < 0x80:
+            pos += 2
+        else:
+            count, pos = _read_varint(data, pos + 1)
+        result = {}
+        for _ in range(count):
+            key, pos = _read_value(data, pos)
+            result[key], pos = _read_value(data, pos)
+        return result, pos
+    if tag == TAG_LIST:
+        count, pos = _read_varint(data, pos + 1)
+        result = []
+        for _ in range(count):
+            item, pos = _read_value(data, pos)
+            result.append(item)
+        return result, pos
+    if tag == TAG_STR:
+        length, pos = _read_varint(data, pos + 1)
+        return data[pos:pos + length].decode('utf-8'), pos + length
+    pos += 1
+    if tag == TAG_NONE:
+        return None, pos
+    if tag == TAG_TRUE:
+        return True, pos
+    if tag == TAG_FALSE:
+        return False, pos
+    if tag == TAG_CARD_INT:
+        return CARDS[data[pos]].to_int_dict(), pos + 1
+    if tag == TAG_FLOAT:
+        return FLOAT.unpack_from(data, pos)[0], pos + FLOAT.size
+    raise ValueError(f"Unknown value tag {tag}")
+
+
+CODECS = {}
+
+
+def register_codec(codec):
+    """Make a codec available for negotiation under its name"""
+    CODECS[codec.name] = codec
+
+
+register_codec(JsonCodec())
+register_codec(BinaryCodec())
+
+
+def get_codec(name):
+    """Return the codec registered under a name, falling back to JSON"""
+    return CODECS.get(name) or CODECS[JSON_CODEC]
+
+
+def negotiate_codec(offered, supported=SUPPORTED_CODECS):
+    """Pick the first supported codec the peer also offered, else JSON"""
+    offered = offered or ()
+    for name in supported:
+        if name in offered and name in CODECS:
+            return name
+    return JSON_CODEC
+
+
+def encode_message(message, codec_name=JSON_CODEC):
+    """Encode a message, falling back to JSON for content the codec cannot carry"""
+    codec = get_codec(codec_name)
+    try:
+        return codec.encode(message)
+    except (TypeError, ValueError, OverflowError, struct.error):
+        if codec.name == JSON_CODEC:
+            raise
+        return CODECS[JSON_CODEC].encode(message)
+
+
+def decode_message(payload):
+    """Decode a payload from any codec; the first byte tells them apart"""
+    if payload[:1] == bytes((BINARY_MAGIC,)):
+        return CODECS[BINARY_CODEC].decode(payload)
+    return CODECS[JSON_CODEC].decode(payload)
@@ -0,0 +1,93 @@
+import struct
+
+# Every frame starts with its payload length as a 4-byte big-endian integer
+FRAME_HEADER = struct.Struct("!I")
+
+DEFAULT_MAX_FRAME_SIZE = 1024 * 1024
+DEFAULT_BUFFER_SIZE = 64 * 1024
+MIN_RECV_SIZE = 4096
+
+
+class FrameTooLargeError(ValueError):
+    """A frame is larger than the configured maximum"""
+
+
+def encode_frame(payload, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+    """Prefix a payload with its length"""
+    if len(payload) > max_frame_size:
+        raise FrameTooLargeError(f"Frame of {len(payload)} bytes exceeds the {max_frame_size} byte limit")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameDecoder:
+    """Incremental decoder for length-prefixed frames.
+
+    Bytes are received straight into one reusable bytearray (recv_into, or
+    get_buffer/buffer_updated for an asyncio BufferedProtocol) or copied in
+    with feed(); frames() then yields every complete payload. A frame may
+    arrive split over many reads, and one read may carry many frames.
+    """
+
+    def __init__(self, max_frame_size=DEFAULT_MAX_FRAME_SIZE, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray(buffer_size)
+        self.start = 0
+        self.end = 0
+        self.missing = 0  # Bytes still to come for the frame being received
+
+    def _reserve(self, size):
+        """Make sure at least size bytes are free after the buffered data"""
+        if self.end + size <= len(self.buffer):
+            return
+        # Move pending bytes to the front before growing the buffer
+        pending = self.end - self.start
+        if self.start:
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+            self.start = 0
+            self.end = pending
+        if pending + size > len(self.buffer):
+            self.buffer.extend(bytes(pending + size - len(self.buffer)))
+
+    def recv_into(self, sock, size=MIN_RECV_SIZE):
+        """Receive from a socket into the buffer; returns 0 when the peer closed"""
+        self._reserve(max(size, self.missing))
+        with memoryview(self.buffer) as view:
+            received = sock.recv_into(view[self.end:])
+        self.end += received
+        return received
+
+    def get_buffer(self, size=MIN_RECV_SIZE):
+        """Return a writable view of the free space at the end of the buffer"""
+        self._reserve(max(size, self.missing))
+        return memoryview(self.buffer)[self.end:]
+
+    def buffer_updated(self, nbytes):
+        """Account for nbytes written into the view from get_buffer()"""
+        self.end += nbytes
+
+    def feed(self, data):
+        """Append received bytes to the buffer"""
+        self._reserve(max(len(data), self.missing))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def frames(self):
+        """Yield the payload of every complete frame in the buffer"""
+        header_size = FRAME_HEADER.size
+        self.missing = 0
+        while self.end - self.start >= header_size:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer, self.start)
+            if length > self.max_frame_size:
+                raise FrameTooLargeError(f"Frame of {length} bytes exceeds the {self.max_frame_size} byte limit")
+            frame_end = self.start + header_size + length
+            if frame_end > self.end:
+                # Room for the rest is made on the next read: the buffer may
+                # still be exported to the transport and cannot be resized here
+                self.missing = frame_end - self.end
+                break
+            payload = bytes(self.buffer[self.start + header_size:frame_end])
+            self.start = frame_end
+            yield payload
+
+        if self.start == self.end:
+            self.start = self.end = 0
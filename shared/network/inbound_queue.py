@@ -0,0 +1,78 @@
+import collections
+import itertools
+
+DEFAULT_CAPACITY = 1024
+
+# What put() does when the queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Make room by discarding the oldest item
+OVERFLOW_DROP_NEWEST = "drop_newest"  # Discard the item being added
+
+
+class InboundQueue:
+    """Bounded FIFO between one producer thread and one consumer thread.
+
+    Built on deques, whose append and popleft are atomic, so neither side
+    takes a lock and both are O(1). When the queue is full the overflow
+    policy decides which item is lost; dropped items are counted. Items put
+    with force=True are always kept, even beyond the capacity: they wait in
+    a deque of their own that is never trimmed, and a sequence number keeps
+    them in order with the other items.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, overflow=OVERFLOW_DROP_OLDEST):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.items = collections.deque()  # (sequence, item)
+        self.forced = collections.deque()  # (sequence, item), never dropped
+        self.sequence = itertools.count()
+        self.dropped = 0
+        self.peak_depth = 0
+
+    def __len__(self):
+        return len(self.items) + len(self.forced)
+
+    def put(self, item, force=False):
+        """Add an item; return False if the item itself was dropped"""
+        if force:
+            self.forced.append((next(self.sequence), item))
+        else:
+            items = self.items
+            if len(items) >= self.capacity:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                try:
+                    items.popleft()
+                    self.dropped += 1
+                except IndexError:
+                    # The consumer emptied the queue in the meantime
+                    pass
+            items.append((next(self.sequence), item))
+        depth = len(self)
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        return True
+
+    def get(self):
+        """Remove and return the oldest item, or None if the queue is empty"""
+        forced = self.forced
+        try:
+            entry = self.items.popleft()
+        except IndexError:
+            entry = None
+        if forced and (entry is None or forced[0][0] < entry[0]):
+            if entry is not None:
+                # A forced item came first: put this one back at the front
+                self.items.appendleft(entry)
+            entry = forced.popleft()
+        return entry[1] if entry is not None else None
+
+    def clear(self):
+        self.items.clear()
+        self.forced.clear()
+
+    def stats(self):
+        """Return the current depth, the deepest the queue has been and the items dropped"""
+        return {"depth": len(self), "peak_depth": self.peak_depth, "dropped": self.dropped}
@@ -10,6 +10,10 @@ class MessageType:
     PLAYER_ACTION = "player_action"
     CHAT = "chat"
     DISCONNECT = "disconnect"
+    GAME_STATE_DELTA = "game_state_delta"
+    STATE_ACK = "state_ack"
+    PING = "ping"
+    PONG = "pong"
 
 
 class ActionType:
@@ -83,6 +87,35 @@ class Message:
         """Create a game state update message"""
         return cls(MessageType.GAME_STATE, host_id, game_state)
 
+    @classmethod
+    def create_game_state_delta_message(cls, host_id, base_version, delta):
+        """Create a game state update relative to an earlier version of the same game"""
+        content = {
+            "base": base_version,
+            "delta": delta
+        }
+        return cls(MessageType.GAME_STATE_DELTA, host_id, content)
+
+    @classmethod
+    def create_state_ack_message(cls, player_id, game_id, version, resync=False):
+        """Create an acknowledgement of the game state version a peer holds"""
+        content = {
+            "game_id": game_id,
+            "version": version,
+            "resync": resync
+        }
+        return cls(MessageType.STATE_ACK, player_id, content)
+
+    @classmethod
+    def create_ping_message(cls, player_id, sent_at):
+        """Create a heartbeat carrying the sender's clock reading"""
+        return cls(MessageType.PING, player_id, {"t": sent_at})
+
+    @classmethod
+    def create_pong_message(cls, player_id, ping):
+        """Create the answer to a heartbeat, echoing its clock reading"""
+        return cls(MessageType.PONG, player_id, {"t": ping.content.get("t")})
+
     @classmethod
     def create_chat_message(cls, player_id, player_name, text):
         """Create a chat message"""
@@ -1,136 +1,783 @@
-import socket
+import asyncio
+import collections
 import threading
-import json
-import uuid
 import time
+import uuid
 from shared.network.message import Message, MessageType
-from shared.network.serializer import Serializer
+from shared.network.framing import DEFAULT_MAX_FRAME_SIZE, FrameDecoder, encode_frame
+from shared.network.codec import (
+    JSON_CODEC, SUPPORTED_CODECS, CODECS, negotiate_codec, encode_message, decode_message
+)
+from shared.network.inbound_queue import InboundQueue, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST
+
+# Pending connections the host's listening socket accepts before refusing
+DEFAULT_BACKLOG = 128
+
+CONNECT_TIMEOUT = 5.0
+SHUTDOWN_TIMEOUT = 2.0
+
+# Priority lanes, highest first. Each lane has its own outbox per peer and
+# its own receive queue, so actions never wait behind game states or chat.
+LANE_CONTROL = 0
+LANE_STATE = 1
+LANE_CHAT = 2
+LANES = (LANE_CONTROL, LANE_STATE, LANE_CHAT)
+LANE_NAMES = ("control", "state", "chat")
+
+MESSAGE_LANES = {
+    MessageType.JOIN_REQUEST: LANE_CONTROL,
+    MessageType.JOIN_RESPONSE: LANE_CONTROL,
+    MessageType.PLAYER_ACTION: LANE_CONTROL,
+    MessageType.DISCONNECT: LANE_CONTROL,
+    MessageType.STATE_ACK: LANE_CONTROL,
+    MessageType.PING: LANE_CONTROL,
+    MessageType.PONG: LANE_CONTROL,
+    MessageType.GAME_STATE: LANE_STATE,
+    MessageType.GAME_STATE_DELTA: LANE_STATE,
+    MessageType.CHAT: LANE_CHAT,
+}
+
+# Per-peer outbound budget of each lane as (bytes, frames): frames wait in
+# the lane's outbox while the peer's transport is backed up. A peer that
+# stays over budget for longer than the grace period is disconnected,
+# except on droppable lanes where the oldest frames are discarded instead.
+DEFAULT_OUTBOX_BYTES = 512 * 1024
+DEFAULT_OUTBOX_FRAMES = 256
+DEFAULT_LANE_BUDGETS = {
+    LANE_CONTROL: (64 * 1024, 256),
+    LANE_STATE: (DEFAULT_OUTBOX_BYTES, DEFAULT_OUTBOX_FRAMES),
+    LANE_CHAT: (128 * 1024, 64),
+}
+DROPPABLE_LANES = frozenset((LANE_CHAT,))
+OUTBOX_GRACE_PERIOD = 5.0
+
+# Bytes the transport may buffer before frames are held back in the outboxes,
+# where they can still be overtaken by higher lanes or replaced. Kept small
+# so an action queued behind bulk traffic waits for at most this much.
+WRITE_BUFFER_HIGH = 16 * 1024
+
+# Received messages waiting for update(), per lane, as (capacity, overflow
+# policy). A flooding peer loses its newest actions but never reorders
+# them; stale states and chat make room for newer ones. A dropped state
+# delta makes the receiver ask for a full snapshot.
+DEFAULT_INBOUND_LANES = {
+    LANE_CONTROL: (1024, OVERFLOW_DROP_NEWEST),
+    LANE_STATE: (256, OVERFLOW_DROP_OLDEST),
+    LANE_CHAT: (256, OVERFLOW_DROP_OLDEST),
+}
+
+# Work update() may do per call: at most this many messages, for at most
+# this many seconds. Higher lanes are drained first, so lower ones only get
+# what is left of the budget.
+UPDATE_MAX_MESSAGES = 512
+UPDATE_TIME_BUDGET = 0.004
+
+# Every peer is pinged this often (seconds). A peer that has answered a
+# ping before and then sends nothing at all for the timeout is considered
+# dead and disconnected; peers that never answer pings predate heartbeats.
+HEARTBEAT_INTERVAL = 1.0
+PEER_TIMEOUT = 10.0
+
+# Gains of the smoothed round-trip time and of its mean deviation (RFC 6298)
+RTT_ALPHA = 0.125
+RTT_BETA = 0.25
+
+# A peer whose connection drops keeps its session (seat, queued frames) for
+# the grace period, during which a client reconnects on its own every
+# RECONNECT_DELAY seconds. Each side keeps the last frames it wrote so those
+# lost with the connection can be written again; a peer further behind
+# resumes without them and gets a full game state instead.
+SESSION_GRACE_PERIOD = 10.0
+RECONNECT_DELAY = 0.5
+REPLAY_FRAMES = 256
+REPLAY_BYTES = 256 * 1024
+
+# Coalescing key of game-state frames: only the newest one is kept queued
+STATE_QUEUE_KEY = "state"
+
+# Events handed from the network thread to update()
+EVENT_MESSAGE = "message"
+EVENT_CONNECTED = "connected"
+EVENT_DISCONNECTED = "disconnected"
+EVENT_RESUMED = "resumed"
+
+# Messages that are not part of a session's numbered stream
+_UNSEQUENCED = frozenset((MessageType.PING, MessageType.PONG))
+
+
+def message_lane(msg_type):
+    """Return the priority lane of a message type; unknown types travel with the state"""
+    return MESSAGE_LANES.get(msg_type, LANE_STATE)
+
+
+class _Session:
+    """A peer's session, outliving the connections it is carried over.
+
+    Frames written after the join handshake are numbered implicitly: sent
+    and received count them on each side (heartbeats excluded), so after a
+    reconnection each side knows which frames the other never got.
+    """
+
+    def __init__(self, token, player_id):
+        self.token = token
+        self.player_id = player_id
+        self.peer = None  # Current _PeerProtocol, or the last one while suspended
+        self.sent = 0
+        self.received = 0
+        self.replay = collections.deque()  # Last frames written, newest last
+        self.replay_bytes = 0
+        self.suspended = False
+        self.ended = False  # Closed on purpose: no resuming
+        self.expiry = None  # Grace period timer while suspended
+
+    def record_sent(self, frame):
+        self.sent += 1
+        self.replay.append(frame)
+        self.replay_bytes += len(frame)
+        while len(self.replay) > REPLAY_FRAMES or (self.replay_bytes > REPLAY_BYTES and len(self.replay) > 1):
+            self.replay_bytes -= len(self.replay.popleft())
+
+    @property
+    def replay_from(self):
+        """The lowest received count a peer can be brought up to date from"""
+        return self.sent - len(self.replay)
+
+    def missed_since(self, received):
+        """Return the frames written after the peer's received count, or None if no longer kept"""
+        if not isinstance(received, int) or received < self.replay_from or received > self.sent:
+            return None
+        count = self.sent - received
+        return list(self.replay)[len(self.replay) - count:] if count else []
+
+
+class _PeerProtocol(asyncio.BufferedProtocol):
+    """One peer connection, driven by the P2PManager event loop.
+
+    Received bytes go straight into the frame decoder's buffer. Outgoing
+    frames go through bounded per-lane outboxes that are drained into the
+    transport, highest lane first, whenever it is not backed up, so a slow
+    peer only ever delays itself. A frame queued under a key replaces the
+    pending frame with the same key instead of queueing behind it (latest
+    state wins).
+    """
+
+    def __init__(self, manager, player_id=None, resume=None):
+        self.manager = manager
+        self.player_id = player_id
+        self.session = None
+        self.resume = resume  # Client: session this connection is resuming
+        self.resumed = manager.loop.create_future() if resume is not None else None
+        self.decoder = FrameDecoder(manager.max_frame_size)
+        self.transport = None
+        self.outboxes = [collections.deque() for _ in LANES]  # [key, tag, frame] entries per lane
+        self.outbox_bytes = [0 for _ in LANES]
+        self.dropped_frames = 0
+        self.keyed = {}  # key -> pending outbox entry
+        self.pending_tags = {}  # key -> tag of the pending entry, read from other threads
+        self.paused = False
+        self.over_budget_since = None
+        self.last_seen = None  # Loop time the peer last sent anything
+        self.rtt = None  # Last round-trip time measured, in seconds
+        self.srtt = None  # Smoothed round-trip time
+        self.rttvar = None  # Round-trip time mean deviation (jitter)
+        self.pings_sent = 0
+        self.pongs_received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.last_seen = self.manager.loop.time()
+        transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        if self.resume is not None:
+            self.manager._request_resume(self)
+        elif self.player_id:
+            self.manager.connections[self.player_id] = self
+
+    def get_buffer(self, sizehint):
+        return self.decoder.get_buffer()
+
+    def buffer_updated(self, nbytes):
+        self.last_seen = self.manager.loop.time()
+        self.decoder.buffer_updated(nbytes)
+        try:
+            for payload in self.decoder.frames():
+                self.manager._on_payload(self, payload)
+        except Exception as e:
+            print(f"Error handling connection: {str(e)}")
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        if self.manager._on_connection_lost(self):
+            # Suspended: the queued frames wait for the session to resume
+            return
+        for outbox in self.outboxes:
+            outbox.clear()
+        self.outbox_bytes = [0 for _ in LANES]
+        self.keyed.clear()
+        self.pending_tags.clear()
+
+    def adopt(self, old):
+        """Take over the session, queued frames and statistics of a lost connection"""
+        self.session = old.session
+        self.session.peer = self
+        self.player_id = old.player_id
+        self.outboxes, old.outboxes = old.outboxes, [collections.deque() for _ in LANES]
+        self.outbox_bytes, old.outbox_bytes = old.outbox_bytes, [0 for _ in LANES]
+        self.keyed, old.keyed = old.keyed, {}
+        self.pending_tags, old.pending_tags = old.pending_tags, {}
+        self.dropped_frames = old.dropped_frames
+        self.rtt, self.srtt, self.rttvar = old.rtt, old.srtt, old.rttvar
+        self.pings_sent = old.pings_sent
+        self.pongs_received = old.pongs_received
+
+    def pause_writing(self):
+        self.paused = True
+
+    def resume_writing(self):
+        self.paused = False
+        self._flush()
+
+    def enqueue(self, frame, lane=LANE_STATE, key=None, tag=None, sequenced=True):
+        """Queue a frame on a lane, replacing the pending frame with the same key
+
+        Tagged frames are (base, version) pairs: a frame only replaces a
+        pending one built on the same base, otherwise it queues behind it.
+        A key must always be used on the same lane. Unsequenced frames are
+        left out of the session's numbering and never replayed.
+        """
+        session = self.session
+        if session is not None and session.peer is not self:
+            # The session has moved on to a new connection
+            session.peer.enqueue(frame, lane, key, tag, sequenced)
+            return
+        if self.transport is None or (self.transport.is_closing() and not (session and session.suspended)):
+            return
+        entry = self.keyed.get(key) if key is not None else None
+        if entry is not None and (tag is None or entry[1] is None or tag[0] == entry[1][0]):
+            self.outbox_bytes[lane] += len(frame) - len(entry[2])
+            entry[1] = tag
+            entry[2] = frame
+        else:
+            entry = [key, tag, frame, sequenced]
+            self.outboxes[lane].append(entry)
+            self.outbox_bytes[lane] += len(frame)
+            if key is not None:
+                self.keyed[key] = entry
+        if key is not None:
+            self.pending_tags[key] = tag
+        self._flush()
+        if lane in DROPPABLE_LANES:
+            self._trim(lane)
+        self._check_budget()
+
+    def _pop(self, lane):
+        """Remove and return the oldest frame of a lane"""
+        entry = self.outboxes[lane].popleft()
+        key, tag, frame, sequenced = entry
+        self.outbox_bytes[lane] -= len(frame)
+        if key is not None and self.keyed.get(key) is entry:
+            del self.keyed[key]
+            del self.pending_tags[key]
+        return frame, sequenced
+
+    def _flush(self):
+        """Hand queued frames to the transport, highest lane first, until it is backed up"""
+        session = self.session
+        for lane, outbox in enumerate(self.outboxes):
+            while outbox and not self.paused:
+                frame, sequenced = self._pop(lane)
+                if session is not None and sequenced:
+                    session.record_sent(frame)
+                # May call pause_writing() when the transport buffer fills up
+                self.transport.write(frame)
+        if self.over_budget_since is not None and not self._over_budget():
+            self.over_budget_since = None
+
+    def _lane_over_budget(self, lane):
+        max_bytes, max_frames = self.manager.lane_budgets[lane]
+        return self.outbox_bytes[lane] > max_bytes or len(self.outboxes[lane]) > max_frames
+
+    def _trim(self, lane):
+        """Drop the oldest frames of a droppable lane until it is within budget"""
+        while self.outboxes[lane] and self._lane_over_budget(lane):
+            self._pop(lane)
+            self.dropped_frames += 1
+
+    def _over_budget(self):
+        return any(self._lane_over_budget(lane) for lane in LANES if lane not in DROPPABLE_LANES)
+
+    def record_pong(self, sent_at, now):
+        """Update the round-trip estimates with the answer to a ping sent at a loop time"""
+        if not isinstance(sent_at, (int, float)) or isinstance(sent_at, bool) or sent_at > now:
+            return
+        rtt = now - sent_at
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += RTT_BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += RTT_ALPHA * (rtt - self.srtt)
+        self.rtt = rtt
+        self.pongs_received += 1
+
+    def stats(self):
+        """Return the peer's latency and outbound queue statistics (times in seconds)"""
+        return {
+            "rtt": self.rtt,
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "idle": self.manager.loop.time() - self.last_seen if self.last_seen is not None else None,
+            "pings_sent": self.pings_sent,
+            "pongs_received": self.pongs_received,
+            "queued_frames": sum(len(outbox) for outbox in self.outboxes),
+            "queued_bytes": sum(self.outbox_bytes),
+            "dropped_frames": self.dropped_frames,
+        }
+
+    def _check_budget(self):
+        if not self._over_budget():
+            self.over_budget_since = None
+        elif self.over_budget_since is None:
+            loop = self.manager.loop
+            self.over_budget_since = loop.time()
+            loop.call_later(self.manager.outbox_grace_period, self._budget_expired)
+
+    def _budget_expired(self):
+        """Disconnect the peer if it stayed over budget for the whole grace period"""
+        if self.over_budget_since is None or self.transport.is_closing():
+            return
+        loop = self.manager.loop
+        remaining = self.over_budget_since + self.manager.outbox_grace_period - loop.time()
+        if remaining > 0:
+            # The budget was met in between and exceeded again since
+            loop.call_later(remaining, self._budget_expired)
+            return
+        print(f"Disconnecting {self.player_id}: outbound queue over budget")
+        self.transport.abort()
 
 
 class P2PManager:
-    def __init__(self, host=True, port=5555):
+    """Peer-to-peer transport running on one asyncio event loop.
+
+    The loop runs in a single background thread however many peers are
+    connected. Connections, frames and writes are only ever touched on that
+    thread; received messages, connections and disconnections are queued
+    and handed to the callbacks from update(), on the caller's thread, one
+    queue per priority lane.
+
+    Peers that ask for it on join get a session. When such a peer's
+    connection drops it is only suspended: it leaves connections, frames
+    sent to it are held, and the disconnection callbacks run only if it has
+    not resumed within the grace period. Clients reconnect by themselves.
+    """
+
+    def __init__(self, host=True, port=5555, max_frame_size=DEFAULT_MAX_FRAME_SIZE, codecs=SUPPORTED_CODECS,
+                 backlog=DEFAULT_BACKLOG, lane_budgets=None, outbox_grace_period=OUTBOX_GRACE_PERIOD,
+                 inbound_lanes=None, update_max_messages=UPDATE_MAX_MESSAGES, update_time_budget=UPDATE_TIME_BUDGET,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, peer_timeout=PEER_TIMEOUT,
+                 session_grace_period=SESSION_GRACE_PERIOD):
         self.host = host
         self.port = port
-        self.socket = None
-        self.connections = {}  # player_id -> connection
+        self.max_frame_size = max_frame_size
+        self.codecs = tuple(codecs)  # Codecs offered to peers, most preferred first
+        self.backlog = backlog
+        self.lane_budgets = dict(DEFAULT_LANE_BUDGETS)
+        self.lane_budgets.update(lane_budgets or {})
+        self.outbox_grace_period = outbox_grace_period
+        self.update_max_messages = update_max_messages
+        self.update_time_budget = update_time_budget
+        self.heartbeat_interval = heartbeat_interval  # None or 0 disables heartbeats
+        self.peer_timeout = peer_timeout
+        self.session_grace_period = session_grace_period  # None or 0 disables sessions
+        self.peer_codecs = {}  # player_id -> codec name; JSON until negotiated
+        self.server = None
+        self.loop = None
+        self.loop_thread = None
+        self.connections = {}  # player_id -> _PeerProtocol (event loop thread only)
+        self.suspended = {}  # player_id -> _PeerProtocol of a session waiting to resume
+        self.sessions = {}  # token -> _Session
+        self.host_address = None
         self.is_running = False
         self.player_id = str(uuid.uuid4())
         self.on_message_callbacks = []
         self.on_connection_callbacks = []
         self.on_disconnection_callbacks = []
-        self.message_queue = []  # Queue for pending messages
+        self.on_resume_callbacks = []
+        lanes = dict(DEFAULT_INBOUND_LANES)
+        lanes.update(inbound_lanes or {})
+        # Events waiting for update(), per lane
+        self.message_queues = [InboundQueue(*lanes[lane]) for lane in LANES]
+
+    def _ensure_loop(self):
+        """Start the event loop thread if it is not running yet"""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.loop_thread.start()
+        if self.heartbeat_interval:
+            self.loop.call_soon_threadsafe(self._heartbeat)
+
+    def _heartbeat(self):
+        """Ping every peer and disconnect the dead ones (event loop thread)"""
+        now = self.loop.time()
+        ping = None
+        for pid, peer in list(self.connections.items()):
+            if peer.transport.is_closing():
+                continue
+            if peer.pongs_received and now - peer.last_seen > self.peer_timeout:
+                print(f"Disconnecting {pid}: no response for {now - peer.last_seen:.1f}s")
+                peer.transport.abort()
+                continue
+            if ping is None:
+                ping = self._framer(Message.create_ping_message(self.player_id, now))
+            peer.enqueue(ping(pid), LANE_CONTROL, sequenced=False)
+            peer.pings_sent += 1
+        self.loop.call_later(self.heartbeat_interval, self._heartbeat)
+
+    def _run(self, coroutine, timeout=None):
+        """Run a coroutine on the event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
 
     def start(self):
         """Start the P2P network manager"""
+        self._ensure_loop()
+        self.is_running = True
         if self.host:
             self._start_host()
-        self.is_running = True
 
     def _start_host(self):
         """Start as a host/server"""
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.socket.bind(('0.0.0.0', self.port))
-        self.socket.listen(5)
-
-        # Start accepting connections in a separate thread
-        threading.Thread(target=self._accept_connections, daemon=True).start()
+        self.server = self._run(self.loop.create_server(
+            lambda: _PeerProtocol(self),
+            '0.0.0.0', self.port,
+            backlog=self.backlog,
+            reuse_address=True
+        ))
 
     def connect_to_host(self, host_address):
         """Connect to a host as a client"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((host_address, self.port))
-
-            # Start receiving messages from host
-            conn_thread = threading.Thread(target=self._handle_connection, args=(self.socket, "host"), daemon=True)
-            conn_thread.start()
-
+            self._ensure_loop()
+            self.is_running = True
+            self.host_address = host_address
+            # The host is registered as soon as the connection is made, so the
+            # join request can be sent right after this returns
+            self._run(
+                self.loop.create_connection(lambda: _PeerProtocol(self, "host"), host_address, self.port),
+                CONNECT_TIMEOUT
+            )
             return True, "Connected to host"
         except Exception as e:
             return False, f"Failed to connect: {str(e)}"
 
-    def _accept_connections(self):
-        """Accept incoming connections (host only)"""
-        while self.is_running:
+    def _on_payload(self, peer, payload):
+        """Handle one received frame (event loop thread)"""
+        # Peers may switch codec mid-stream, so every payload is sniffed
+        message = decode_message(payload)
+
+        if peer.resume is not None:
+            self._on_resume_response(peer, message)
+            return
+
+        # The first message must identify the player
+        if not peer.player_id:
+            if message.msg_type != MessageType.JOIN_REQUEST:
+                return
+            token = message.content.get("session")
+            if token is not None:
+                self._resume_session(peer, token, message.content)
+                return
+            peer.player_id = message.content["player_id"]
+            self._accept_join(peer, message.content)
+            self.connections[peer.player_id] = peer
+
+            # Notify callbacks about new connection
+            self.message_queues[LANE_CONTROL].put((EVENT_CONNECTED, peer.player_id, message.content), force=True)
+            return
+
+        # Heartbeats are answered and measured here, update() never sees them
+        if message.msg_type == MessageType.PING:
+            pong = Message.create_pong_message(self.player_id, message)
+            peer.enqueue(self._framer(pong)(peer.player_id), LANE_CONTROL, sequenced=False)
+            return
+        if message.msg_type == MessageType.PONG:
+            peer.record_pong(message.content.get("t"), self.loop.time())
+            return
+
+        session = peer.session
+        if message.msg_type == MessageType.JOIN_RESPONSE and ("codec" in message.content or "session" in message.content):
+            # The host's answer to our handshake (see _accept_join): it is not
+            # sequenced and belongs to the transport, update() never sees it
+            if message.content.get("codec") in CODECS:
+                self.peer_codecs[peer.player_id] = message.content["codec"]
+            if session is None and message.content.get("session"):
+                self._start_session(peer, message.content["session"])
+            return
+
+        if session is not None and message.msg_type not in _UNSEQUENCED:
+            session.received += 1
+
+        if message.msg_type == MessageType.DISCONNECT and session is not None:
+            # Leaving on purpose: no grace period
+            self._end_session(session)
+
+        # Add message to queue instead of processing immediately
+        self.message_queues[message_lane(message.msg_type)].put((EVENT_MESSAGE, peer.player_id, message))
+
+    def _on_connection_lost(self, peer):
+        """Forget a closed connection; return True if its session was suspended (event loop thread)"""
+        if peer.resume is not None:
+            # A resume attempt failed: _reconnect() tries again
+            if not peer.resumed.done():
+                peer.resumed.set_result(False)
+            return False
+
+        player_id = peer.player_id
+        if not player_id or self.connections.get(player_id) is not peer:
+            return False
+        del self.connections[player_id]
+
+        session = peer.session
+        if session is not None and not session.ended and self.is_running and self.session_grace_period:
+            self._suspend(peer)
+            return True
+
+        self.peer_codecs.pop(player_id, None)
+        if session is not None:
+            self.sessions.pop(session.token, None)
+
+        # Notify callbacks about disconnection, after every message the
+        # peer sent: update() handles the lowest lane last
+        self.message_queues[LANES[-1]].put((EVENT_DISCONNECTED, player_id, None), force=True)
+        return False
+
+    def _accept_join(self, peer, content):
+        """Pick the codec for a joining peer and open its session if asked (host only)"""
+        offered = content.get("codecs")
+        wants_session = "session" in content and self.session_grace_period
+        if not offered and not wants_session:
+            # Older peers only speak JSON and know nothing of sessions
+            return
+        response = Message.create_join_response(self.player_id, True)
+        if offered:
+            codec = negotiate_codec(offered, self.codecs)
+            response.content["codec"] = codec
+            self.peer_codecs[peer.player_id] = codec
+        if wants_session:
+            response.content["session"] = uuid.uuid4().hex
+        # The response itself is always JSON, the peer switches once it reads
+        # it, and the session's numbering starts right after it
+        peer.enqueue(encode_frame(encode_message(response), self.max_frame_size), LANE_CONTROL, sequenced=False)
+        if wants_session:
+            self._start_session(peer, response.content["session"])
+
+    def _start_session(self, peer, token):
+        session = _Session(token, peer.player_id)
+        session.peer = peer
+        peer.session = session
+        self.sessions[token] = session
+
+    def _end_session(self, session):
+        session.ended = True
+        self.sessions.pop(session.token, None)
+
+    def _suspend(self, peer):
+        """Hold a dropped peer's session for the grace period (event loop thread)"""
+        session = peer.session
+        session.suspended = True
+        peer.paused = True
+        self.suspended[peer.player_id] = peer
+        session.expiry = self.loop.call_later(self.session_grace_period, self._expire_session, session)
+        if not self.host:
+            self.loop.create_task(self._reconnect(session))
+
+    def _expire_session(self, session):
+        """Give up on a suspended session: the peer is disconnected for good"""
+        if not session.suspended:
+            return
+        session.suspended = False
+        if session.expiry is not None:
+            session.expiry.cancel()
+        self._end_session(session)
+        player_id = session.player_id
+        peer = self.suspended.pop(player_id, None)
+        if peer is not None:
+            peer.connection_lost(None)
+        self.peer_codecs.pop(player_id, None)
+        self.message_queues[LANES[-1]].put((EVENT_DISCONNECTED, player_id, None), force=True)
+
+    def _resume_session(self, peer, token, content):
+        """Carry a session over to a new connection (host only)"""
+        session = self.sessions.get(token)
+        if session is None or session.ended:
+            response = Message.create_join_response(self.player_id, False, reason="unknown session")
+            peer.transport.write(encode_frame(encode_message(response), self.max_frame_size))
+            peer.transport.close()
+            return
+
+        old = session.peer
+        if not session.suspended:
+            # The old connection is half-open and has not timed out yet
+            del self.connections[old.player_id]
+            self._suspend(old)
+            old.transport.abort()
+
+        # Frames the peer never got, unless too many were lost
+        missed = session.missed_since(content.get("received"))
+        caught_up = missed is not None
+        resume_from = content.get("received") if caught_up else session.sent
+        # Frames it sent that never arrived are written again by the peer,
+        # or skipped if it no longer has them
+        sent = content.get("sent", 0)
+        if not content.get("replay_from", 0) <= session.received <= sent:
+            session.received = sent
+
+        response = Message.create_join_response(self.player_id, True)
+        response.content.update({
+            "session": token,
+            "received": session.received,
+            "resume_from": resume_from,
+            "caught_up": caught_up,
+        })
+        peer.transport.write(encode_frame(encode_message(response), self.max_frame_size))
+        self._complete_resume(peer, old, missed or ())
+        self.message_queues[LANE_CONTROL].put((EVENT_RESUMED, session.player_id, {"caught_up": caught_up}), force=True)
+
+    def _complete_resume(self, peer, old, missed):
+        """Switch a suspended session to its new connection and catch the peer up"""
+        session = old.session
+        session.suspended = False
+        if session.expiry is not None:
+            session.expiry.cancel()
+            session.expiry = None
+        self.suspended.pop(old.player_id, None)
+        peer.adopt(old)
+        for frame in missed:
+            peer.transport.write(frame)
+        self.connections[peer.player_id] = peer
+        peer._flush()
+
+    def _request_resume(self, peer):
+        """Ask the host to carry our session over to this connection (client only)"""
+        session = peer.resume
+        request = Message(MessageType.JOIN_REQUEST, self.player_id, {
+            "session": session.token,
+            "received": session.received,
+            "sent": session.sent,
+            "replay_from": session.replay_from,
+            "codecs": list(self.codecs),
+        })
+        peer.transport.write(encode_frame(encode_message(request), self.max_frame_size))
+
+    def _on_resume_response(self, peer, message):
+        """Handle the host's answer to a resume request (client only)"""
+        session = peer.resume
+        peer.resume = None
+        content = message.content
+        if message.msg_type != MessageType.JOIN_RESPONSE or not content.get("accepted") or not session.suspended:
+            peer.resumed.set_result(False)
+            peer.transport.close()
+            self._expire_session(session)
+            return
+
+        session.received = content.get("resume_from", session.received)
+        missed = session.missed_since(content.get("received")) or ()
+        self._complete_resume(peer, session.peer, missed)
+        peer.resumed.set_result(True)
+        self.message_queues[LANE_CONTROL].put(
+            (EVENT_RESUMED, session.player_id, {"caught_up": bool(content.get("caught_up"))}), force=True
+        )
+
+    async def _reconnect(self, session):
+        """Reconnect to the host until the session resumes or expires (client only)"""
+        while self.is_running and session.suspended:
+            peer = None
             try:
-                client_socket, address = self.socket.accept()
-                # Start a new thread to handle this connection
-                conn_thread = threading.Thread(
-                    target=self._handle_connection,
-                    args=(client_socket, None),
-                    daemon=True
-                )
-                conn_thread.start()
-            except Exception as e:
-                print(f"Error accepting connection: {str(e)}")
-                time.sleep(0.1)
-
-    def _handle_connection(self, client_socket, player_id=None):
-        """Handle a client connection"""
-        try:
-            # Wait for identification message if player_id not yet known
-            if not player_id:
-                data = client_socket.recv(4096)
-                if not data:
+                _, peer = await asyncio.wait_for(self.loop.create_connection(
+                    lambda: _PeerProtocol(self, session.player_id, resume=session), self.host_address, self.port
+                ), CONNECT_TIMEOUT)
+                if await asyncio.wait_for(asyncio.shield(peer.resumed), CONNECT_TIMEOUT):
                     return
+            except (OSError, asyncio.TimeoutError):
+                if peer is not None:
+                    peer.transport.abort()
+            await asyncio.sleep(RECONNECT_DELAY)
 
-                message = Message.from_json(data.decode('utf-8'))
-                if message.msg_type == MessageType.JOIN_REQUEST:
-                    player_id = message.content["player_id"]
+    def _framer(self, message):
+        """Return a function giving the frame of a message for a peer, encoded once per codec"""
+        frames = {}
 
-                    # Notify callbacks about new connection
-                    for callback in self.on_connection_callbacks:
-                        callback(player_id, message.content)
+        def frame_for(pid):
+            codec = self.peer_codecs.get(pid, JSON_CODEC)
+            frame = frames.get(codec)
+            if frame is None:
+                frame = frames[codec] = encode_frame(encode_message(message, codec), self.max_frame_size)
+            return frame
 
-            # Add connection to our map
-            self.connections[player_id] = client_socket
+        return frame_for
 
-            # Continue receiving messages
-            while self.is_running:
-                data = client_socket.recv(4096)
-                if not data:
-                    break
+    def _peers(self):
+        """Return the connected and suspended peers by player id; frames for the latter are held"""
+        peers = dict(self.suspended)
+        peers.update(self.connections)
+        return peers
 
-                message = Message.from_json(data.decode('utf-8'))
-                # Add message to queue instead of processing immediately
-                self.message_queue.append((player_id, message))
+    def _write(self, peer, frame, lane, key=None, tag=None):
+        """Queue a frame on one of a peer's outboxes from any thread"""
+        self.loop.call_soon_threadsafe(peer.enqueue, frame, lane, key, tag)
 
-        except Exception as e:
-            print(f"Error handling connection: {str(e)}")
-        finally:
-            # Handle disconnection
-            if player_id and player_id in self.connections:
-                del self.connections[player_id]
-
-                # Notify callbacks about disconnection
-                for callback in self.on_disconnection_callbacks:
-                    callback(player_id)
+    def pending_tag(self, player_id, key=STATE_QUEUE_KEY):
+        """Return the tag of the frame still queued for a peer under a key, or None"""
+        peer = self.connections.get(player_id)
+        if peer is None:
+            return None
+        return peer.pending_tags.get(key)
 
     def send_message(self, message, player_id=None):
         """Send a message to a specific player or all connected players"""
-        message_json = message.to_json()
+        if message.msg_type == MessageType.JOIN_REQUEST and not self.host:
+            # Offer our codecs to the host, and ask for a session, without
+            # touching the caller's message
+            content = dict(message.content)
+            content.setdefault("codecs", list(self.codecs))
+            if self.session_grace_period:
+                content.setdefault("session", None)
+            message = Message(message.msg_type, message.sender_id, content, message.timestamp, message.message_id)
+
+        frame_for = self._framer(message)
+        lane = message_lane(message.msg_type)
+        connections = self._peers()
 
-        if player_id and player_id in self.connections:
+        if player_id and player_id in connections:
             # Send to specific player
-            try:
-                self.connections[player_id].send(message_json.encode('utf-8'))
-                return True
-            except Exception as e:
-                print(f"Error sending to {player_id}: {str(e)}")
-                return False
+            self._write(connections[player_id], frame_for(player_id), lane)
+            return True
         elif player_id is None:
             # Send to all connected players
-            for pid, conn in list(self.connections.items()):
-                try:
-                    conn.send(message_json.encode('utf-8'))
-                except Exception as e:
-                    print(f"Error broadcasting to {pid}: {str(e)}")
-                    del self.connections[pid]
+            for pid, peer in connections.items():
+                self._write(peer, frame_for(pid), lane)
             return True
         else:
             return False
 
+    def send_to(self, message, player_ids, key=None, tag=None):
+        """Send the same message to several players
+
+        A message sent with a key replaces the one still queued for a peer
+        under the same key; the tag is kept with it (see pending_tag).
+        """
+        frame_for = self._framer(message)
+        lane = message_lane(message.msg_type)
+        connections = self._peers()
+        sent = True
+        for pid in player_ids:
+            peer = connections.get(pid)
+            if peer is None:
+                sent = False
+                continue
+            self._write(peer, frame_for(pid), lane, key, tag)
+        return sent
+
     def register_message_callback(self, callback):
         """Register a callback for when messages are received"""
         self.on_message_callbacks.append(callback)
@@ -143,30 +790,103 @@ class P2PManager:
         """Register a callback for when connections are closed"""
         self.on_disconnection_callbacks.append(callback)
 
+    def register_resume_callback(self, callback):
+        """Register a callback for when a dropped peer resumes its session
+
+        The callback gets the player id and a dict whose "caught_up" is
+        False when frames were lost for good and a full game state is needed.
+        """
+        self.on_resume_callbacks.append(callback)
+
+    async def _shutdown(self):
+        if self.server:
+            self.server.close()
+        for pid, peer in list(self.connections.items()):
+            if peer.session is not None:
+                # Tell the peer not to wait for us to come back
+                self._end_session(peer.session)
+                goodbye = Message.create_disconnect_message(self.player_id)
+                peer.enqueue(self._framer(goodbye)(pid), LANE_CONTROL)
+            peer.transport.close()
+        for session in self.sessions.values():
+            if session.expiry is not None:
+                session.expiry.cancel()
+        self.connections.clear()
+        self.suspended.clear()
+        self.sessions.clear()
+        self.peer_codecs.clear()
+
     def close(self):
         """Close all connections and stop the manager"""
         self.is_running = False
+        if self.loop is None:
+            return
 
-        # Close all connections
-        for conn in self.connections.values():
-            try:
-                conn.close()
-            except:
-                pass
+        try:
+            self._run(self._shutdown(), SHUTDOWN_TIMEOUT)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(SHUTDOWN_TIMEOUT)
+        if not self.loop.is_running():
+            self.loop.close()
+        self.loop = None
+        self.loop_thread = None
+        self.server = None
 
-        # Close main socket
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
+    def get_peer_stats(self, player_id=None):
+        """Return the latency and queue statistics of a peer, or of every peer by player id
 
-        self.connections.clear()
+        rtt is the last round-trip time measured, srtt its smoothed value
+        and rttvar the jitter, all in seconds (None until a ping was
+        answered); idle is the time since the peer last sent anything.
+        """
+        if player_id is not None:
+            peer = self.connections.get(player_id)
+            return peer.stats() if peer is not None else None
+        return {pid: peer.stats() for pid, peer in dict(self.connections).items()}
+
+    def get_queue_stats(self):
+        """Return the depth, peak depth and dropped count of each receive lane, by lane name"""
+        return {LANE_NAMES[lane]: self.message_queues[lane].stats() for lane in LANES}
+
+    def update(self, max_messages=None, time_budget=None):
+        """Process any pending network messages
 
-    def update(self):
-        """Process any pending network messages"""
-        # Process any messages in the queue
-        while self.message_queue:
-            sender_id, message = self.message_queue.pop(0)
+        Lanes are handled highest first, until max_messages messages have
+        been handled (default update_max_messages) or the time budget in
+        seconds (default update_time_budget) runs out; the rest waits for
+        the next call. Returns the number of messages handled.
+        """
+        if max_messages is None:
+            max_messages = self.update_max_messages
+        if time_budget is None:
+            time_budget = self.update_time_budget
+        deadline = time.perf_counter() + time_budget
+        handled = 0
+
+        for lane in LANES:
+            lane_queue = self.message_queues[lane]
+            while lane_queue:
+                if handled >= max_messages or time.perf_counter() >= deadline:
+                    # Out of budget: lower lanes wait too, so a disconnection
+                    # is never handled before the peer's remaining messages
+                    return handled
+                event, player_id, data = lane_queue.get()
+                self._dispatch(event, player_id, data)
+                handled += 1
+        return handled
+
+    def _dispatch(self, event, player_id, data):
+        if event == EVENT_MESSAGE:
             for callback in self.on_message_callbacks:
-                callback(sender_id, message)
\ No newline at end of file
+                callback(player_id, data)
+        elif event == EVENT_CONNECTED:
+            for callback in self.on_connection_callbacks:
+                callback(player_id, data)
+        elif event == EVENT_RESUMED:
+            for callback in self.on_resume_callbacks:
+                callback(player_id, data)
+        else:
+            for callback in self.on_disconnection_callbacks:
+                callback(player_id)
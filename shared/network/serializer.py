@@ -1,5 +1,5 @@
 import json
-from shared.models.card import Suits, Values, Card
+from shared.models.card import Card
 from shared.game_logic.state_manager import GameState
 
 
@@ -17,15 +17,9 @@ class Serializer:
     @staticmethod
     def serialize_card(card):
         """Convert a card to a serializable dict"""
-        return {
-            "suit": card.suit.value,
-            "value": card.value.value
-        }
+        return card.to_int_dict()
 
     @staticmethod
     def deserialize_card(card_dict):
         """Convert a dict back to a Card object"""
-        return Card(
-            Suits(card_dict["suit"]),
-            Values(card_dict["value"])
-        )
\ No newline at end of file
+        return Card.from_dict(card_dict)
\ No newline at end of file
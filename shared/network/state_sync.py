@@ -0,0 +1,209 @@
+from collections import OrderedDict
+from shared.network.message import Message
+
+# Versions of the game state kept on the host to compute deltas from
+STATE_HISTORY_SIZE = 32
+
+# Marker for lists that cannot be patched and are sent whole
+_REPLACE = object()
+
+
+def compute_delta(old, new):
+    """Return a patch that turns the old state dict into the new one, or None if equal
+
+    A dict patch has up to three keys: "s" maps keys to new values, "p"
+    maps keys to nested patches and "d" lists removed keys. A list patch
+    drops "t" items from the front and appends the "a" items (hands growing,
+    the message window sliding), or patches items in place by index: "i"
+    for nested dict patches and "r" for replaced items.
+    """
+    patch = {}
+    changed = {}
+    nested = {}
+    for key, value in new.items():
+        if key not in old:
+            changed[key] = value
+            continue
+        before = old[key]
+        # Unchanged snapshot sections are shared between versions
+        if before is value:
+            continue
+        if isinstance(value, dict) and isinstance(before, dict):
+            sub = compute_delta(before, value)
+            if sub is not None:
+                nested[key] = sub
+        elif isinstance(value, (list, tuple)) and isinstance(before, (list, tuple)):
+            sub = _list_delta(before, value)
+            if sub is _REPLACE:
+                changed[key] = value
+            elif sub is not None:
+                nested[key] = sub
+        elif before != value or type(before) is not type(value):
+            changed[key] = value
+
+    removed = [key for key in old if key not in new]
+    if changed:
+        patch["s"] = changed
+    if nested:
+        patch["p"] = nested
+    if removed:
+        patch["d"] = removed
+    return patch or None
+
+
+def _list_delta(old, new):
+    if len(old) == len(new) and all(a is b or a == b for a, b in zip(old, new)):
+        return None
+
+    # Items dropped from the front and/or appended at the end
+    for drop in range(len(old)):
+        kept = len(old) - drop
+        if kept <= len(new) and list(old[drop:]) == list(new[:kept]):
+            patch = {"a": list(new[kept:])}
+            if drop:
+                patch["t"] = drop
+            return patch
+
+    if len(old) != len(new):
+        return _REPLACE
+
+    # Same length: patch the items that changed
+    patches = {}
+    replaced = {}
+    for i, (before, value) in enumerate(zip(old, new)):
+        if before is value or before == value:
+            continue
+        if isinstance(before, dict) and isinstance(value, dict):
+            patches[str(i)] = compute_delta(before, value)
+        else:
+            replaced[str(i)] = value
+    patch = {}
+    if patches:
+        patch["i"] = patches
+    if replaced:
+        patch["r"] = replaced
+    return patch
+
+
+def apply_delta(state, patch):
+    """Apply a patch from compute_delta to a state dict in place and return it"""
+    for key, value in patch.get("s", {}).items():
+        state[key] = value
+    for key in patch.get("d", ()):
+        state.pop(key, None)
+    for key, sub in patch.get("p", {}).items():
+        target = state[key]
+        if isinstance(target, dict):
+            apply_delta(target, sub)
+        else:
+            _apply_list_delta(target, sub)
+    return state
+
+
+def _apply_list_delta(items, patch):
+    drop = patch.get("t")
+    if drop:
+        del items[:drop]
+    items.extend(patch.get("a", ()))
+    for index, sub in patch.get("i", {}).items():
+        apply_delta(items[int(index)], sub)
+    for index, value in patch.get("r", {}).items():
+        items[int(index)] = value
+
+
+class StateSync:
+    """Host side of the delta game-state protocol.
+
+    Keeps the last few game states by version and, for each peer, the
+    version last sent and the version it last acknowledged. Deltas chain on
+    the version last sent, which the peer will hold once the connection has
+    delivered everything in order. A peer that reports it could not apply a
+    delta, that has not acknowledged for too many versions, or whose base
+    fell out of the history gets a full snapshot instead, and so does every
+    peer when a new game starts: a delta never spans two game ids.
+    """
+
+    def __init__(self, history_size=STATE_HISTORY_SIZE):
+        self.history_size = history_size
+        self.history = OrderedDict()  # (game_id, version) -> state
+        self.peers = {}  # player_id -> {"sent", "acked", "full"} (game_id, version) keys
+
+    @staticmethod
+    def _key(state):
+        return state["game_id"], state["version"]
+
+    def record(self, state):
+        """Remember a state so later deltas can be computed against it"""
+        key = self._key(state)
+        if key in self.history:
+            return
+        self.history[key] = state
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+
+    def _base_key(self, peer, key, pending):
+        """Return the version to compute a peer's delta against, or None for a full snapshot"""
+        sent = peer["sent"]
+        if pending is not None and pending[1] == sent:
+            # The last state sent is still queued and the new one will replace
+            # it, so the peer is still at that message's base
+            sent = pending[0]
+        if sent is None or sent[0] != key[0] or sent not in self.history:
+            return None
+        # Peers that stopped acknowledging are resynchronized from scratch
+        acked = peer["acked"]
+        reference = acked if acked is not None and acked[0] == key[0] else peer["full"]
+        if reference is None or reference[0] != key[0] or key[1] - reference[1] > self.history_size:
+            return None
+        return sent
+
+    def messages_for(self, peer_ids, state, sender_id, pending=None):
+        """Return (message, peer_ids, tag) triples bringing every peer to the given state
+
+        Peers sharing a base get the same message, so it is encoded once. The
+        tag is the message's (base, version) pair. When state messages are
+        coalesced on the way out, pending(peer_id) must return the tag of
+        the state message still queued for the peer, or None.
+        """
+        self.record(state)
+        key = self._key(state)
+        groups = {}
+        for peer_id in peer_ids:
+            peer = self._peer(peer_id)
+            if peer["sent"] == key:
+                continue
+            base_key = self._base_key(peer, key, pending(peer_id) if pending else None)
+            if base_key is None:
+                peer["full"] = key
+            groups.setdefault(base_key, []).append(peer_id)
+            peer["sent"] = key
+
+        result = []
+        for base_key, members in groups.items():
+            if base_key is None:
+                message = Message.create_game_state_message(sender_id, state)
+            else:
+                delta = compute_delta(self.history[base_key], state) or {}
+                message = Message.create_game_state_delta_message(sender_id, base_key[1], delta)
+            result.append((message, members, (base_key, key)))
+        return result
+
+    def _peer(self, peer_id):
+        peer = self.peers.get(peer_id)
+        if peer is None:
+            peer = self.peers[peer_id] = {"sent": None, "acked": None, "full": None}
+        return peer
+
+    def acknowledge(self, peer_id, content):
+        """Handle a STATE_ACK from a peer"""
+        peer = self._peer(peer_id)
+        if content.get("resync"):
+            # The peer could not apply a delta: send a full snapshot next time
+            peer["sent"] = None
+            peer["acked"] = None
+            return
+        peer["acked"] = (content.get("game_id"), content.get("version"))
+
+    def remove_peer(self, peer_id):
+        """Forget a disconnected peer"""
+        self.peers.pop(peer_id, None)
@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from shared.game_logic.batch_simulator import BatchSimulator
+from shared.game_logic.simulator import Simulator
+
+STRATEGIES = ["conservative", "default", "aggressive"]
+
+
+def test_matches_simulator_without_penetration():
+    # Simulator with penetration=0 reshuffles every round, like BatchSimulator
+    expected = Simulator(STRATEGIES, penetration=0, seed=1).run(20000).stats
+    actual = BatchSimulator(STRATEGIES, tables=10000, seed=1).run(100000).stats
+
+    for name in STRATEGIES:
+        a, b = expected[name], actual[name]
+        # Five standard errors of the difference between the two estimates
+        win_se = math.sqrt(a.win_rate * (1 - a.win_rate) / a.rounds + b.win_rate * (1 - b.win_rate) / b.rounds)
+        delta_se = math.sqrt(a.variance / a.rounds + b.variance / b.rounds)
+        assert abs(a.win_rate - b.win_rate) < 5 * win_se, name
+        assert abs(a.average_delta - b.average_delta) < 5 * delta_se, name
+
+
+def test_same_seed_same_result():
+    first = BatchSimulator(STRATEGIES, tables=1000, seed=7).run(1000).stats
+    second = BatchSimulator(STRATEGIES, tables=1000, seed=7).run(1000).stats
+    for name in STRATEGIES:
+        assert first[name].to_dict() == second[name].to_dict()
+
+
+def test_money_is_conserved():
+    simulator = BatchSimulator(STRATEGIES, tables=1000, seed=3)
+    deltas = simulator.play_batch()
+    # Every pot is paid out in full, or kept when everyone busts
+    totals = deltas.sum(axis=1)
+    assert ((totals == 0) | (totals == -simulator.bet * len(STRATEGIES))).all()
+
+
+def test_full_table_deals_without_running_out():
+    simulator = BatchSimulator(["default"] * 18, tables=2000, seed=5)
+    assert simulator.play_batch().shape == (2000, 18)
+
+
+def test_too_many_seats_for_the_shoe():
+    with pytest.raises(ValueError):
+        BatchSimulator(["default"] * 19, tables=10)
+    BatchSimulator(["default"] * 36, tables=10, num_decks=2)
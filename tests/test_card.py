@@ -0,0 +1,51 @@
+import copy
+import pickle
+
+import pytest
+
+from shared.models.card import CARD_COUNT, CARDS, Card, Suits, Values, card_code
+
+
+def test_every_card_is_interned():
+    assert len(CARDS) == CARD_COUNT == 52
+    for suit in Suits:
+        for value in Values:
+            card = Card(suit, value)
+            assert card is Card(suit.value, value.value)
+            assert card is CARDS[card_code(suit, value)] is Card.from_code(card.code)
+            assert (card.suit, card.value) == (suit, value)
+
+
+def test_points():
+    assert [card.points for card in CARDS[:13]] == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]
+    assert all(card.get_value() == card.points for card in CARDS)
+
+
+@pytest.mark.parametrize("card", [CARDS[0], CARDS[25], CARDS[51]], ids=repr)
+def test_round_trips_keep_identity(card):
+    assert Card.from_dict(card.to_dict()) is card
+    assert Card.from_dict(card.to_int_dict()) is card
+    assert pickle.loads(pickle.dumps(card)) is card
+    assert copy.copy(card) is card and copy.deepcopy(card) is card
+
+
+def test_cards_are_immutable():
+    card = Card(Suits.SPADES, Values.ACE)
+    with pytest.raises(AttributeError):
+        card.value = Values.KING
+    with pytest.raises(AttributeError):
+        del card.suit
+
+
+@pytest.mark.parametrize("suit, value", [(0, 1), (5, 1), (1, 0), (1, 14), (-1, -1)])
+def test_invalid_suit_or_value(suit, value):
+    with pytest.raises(ValueError):
+        card_code(suit, value)
+    with pytest.raises(ValueError):
+        Card(suit, value)
+
+
+@pytest.mark.parametrize("code", [-1, CARD_COUNT, 100])
+def test_invalid_code(code):
+    with pytest.raises(ValueError):
+        Card.from_code(code)
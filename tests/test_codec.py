@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from shared.models.game import Game
+from shared.models.player import Player
+from shared.network.codec import (
+    BINARY_CODEC, BINARY_MAGIC, JSON_CODEC, decode_message, encode_message, negotiate_codec
+)
+from shared.network.message import ActionType, Message
+
+
+def _game_state():
+    game = Game(seed=11)
+    game.initialize_game(Player("Ana", 1000, "p1"))
+    game.add_player(Player("Bot Normal", 1000, "p2"))
+    game.start_game()
+    game.place_bet("p1", 100)
+    game.place_bet("p2", 100)
+    game.messages.append("Rodada iniciada")
+    return game.get_game_state()
+
+
+MESSAGES = [
+    Message.create_join_request("3c1e0f5a-2f55-4c57-9f2c-6a4c1b9d0e11", "Ana"),
+    Message.create_join_response("host", True, reason=None),
+    Message.create_action_message("p1", ActionType.PLACE_BET, {"amount": 250}),
+    Message.create_chat_message("p1", "Ana", "olá, ção 🂡"),
+    Message.create_game_state_message("host", _game_state()),
+    Message.create_game_state_delta_message("host", 3, {"s": {"state": "PLAYER_TURN"}, "d": ["x"]}),
+    Message.create_ping_message("p1", 12.5),
+    Message("custom_type", 42, {"n": -(2 ** 40), "f": 0.1, "l": [None, True, False, [1, {"a": 2}]]}),
+]
+
+
+@pytest.mark.parametrize("message", MESSAGES, ids=lambda message: str(message.msg_type))
+def test_binary_decodes_like_json(message):
+    payload = encode_message(message, BINARY_CODEC)
+    assert payload[0] == BINARY_MAGIC
+    binary = decode_message(payload)
+    expected = decode_message(encode_message(message, JSON_CODEC))
+    for field in ("msg_type", "sender_id", "content", "timestamp", "message_id"):
+        assert getattr(binary, field) == getattr(expected, field), field
+
+
+def test_binary_is_smaller_for_game_states():
+    message = Message.create_game_state_message("host", _game_state())
+    assert len(encode_message(message, BINARY_CODEC)) < len(encode_message(message, JSON_CODEC)) / 2
+
+
+def test_unencodable_content_falls_back_to_json():
+    message = Message(MESSAGES[2].msg_type, "p1", {1: "integer key"})
+    payload = encode_message(message, BINARY_CODEC)
+    assert payload[:1] == b"{"
+    assert decode_message(payload).content == json.loads(json.dumps({1: "integer key"}))
+
+
+def test_negotiation():
+    assert negotiate_codec([BINARY_CODEC, JSON_CODEC]) == BINARY_CODEC
+    assert negotiate_codec(None) == JSON_CODEC
+    # Peers built before the heartbeat strings only speak version 1
+    assert negotiate_codec(["binary-v1", JSON_CODEC]) == JSON_CODEC
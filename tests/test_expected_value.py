@@ -0,0 +1,79 @@
+import pytest
+
+from shared.game_logic.expected_value import ExpectedValueCalculator
+from shared.models.card import Card, Suits, Values
+from shared.models.game import Game
+from shared.models.hand import Hand
+from shared.models.player import Player
+
+
+def _hand(*values):
+    hand = Hand()
+    for value in values:
+        hand.add_card(Card(Suits.SPADES, value))
+    return hand
+
+
+def _counts(**cards):
+    """Rank counts (ace to ten) holding only the given cards"""
+    counts = [0] * 10
+    for points, count in cards.items():
+        counts[int(points[1:]) - 1] = count
+    return counts
+
+
+def _player(name, *values):
+    player = Player(name, 1000, name)
+    player.hand = _hand(*values)
+    return player
+
+
+def test_best_opponents_counts_ties():
+    players = [
+        _player("a", Values.TEN, Values.KING),
+        _player("b", Values.TEN, Values.QUEEN),
+        _player("c", Values.NINE, Values.JACK),
+        _player("d", Values.KING, Values.QUEEN, Values.FIVE),
+    ]
+    calculator = ExpectedValueCalculator()
+    assert calculator.best_opponents(players, players[2]) == (20, 2)
+    assert calculator.best_opponents(players, players[0]) == (20, 1)
+    assert calculator.best_opponents(players[3:], players[3]) == (0, 0)
+
+
+def test_standing_on_a_tie_is_a_push():
+    calculator = ExpectedValueCalculator()
+    # Only a ten is left: hitting 20 busts
+    result = calculator.evaluate(_hand(Values.TEN, Values.KING), _counts(p10=1), 20, 200, 100, tied=1)
+    assert result["stand"] == pytest.approx(0)
+    assert result["hit"] == pytest.approx(-100)
+    assert result["best"] == "stand"
+    # Three-way tie: a third of the pot
+    result = calculator.evaluate(_hand(Values.TEN, Values.KING), _counts(p10=1), 20, 300, 100, tied=2)
+    assert result["stand"] == pytest.approx(0)
+
+
+def test_hitting_to_break_a_tie():
+    calculator = ExpectedValueCalculator()
+    # An ace makes 21 and wins outright, a ten busts
+    result = calculator.evaluate(_hand(Values.TEN, Values.KING), _counts(p1=1, p10=1), 20, 200, 100, tied=1)
+    assert result["stand"] == pytest.approx(0)
+    assert result["hit"] == pytest.approx(0.5 * 200 - 100)
+    assert calculator.expected_share(20, 0, _counts(p1=3, p10=1), 20, tied=1) == pytest.approx(0.75)
+    assert calculator.expected_share(20, 0, _counts(p1=1, p10=3), 20, tied=1) == pytest.approx(0.5)
+
+
+def test_tied_winners_split_the_pot():
+    game = Game()
+    players = [
+        _player("a", Values.TEN, Values.KING),
+        _player("b", Values.TEN, Values.QUEEN),
+        _player("c", Values.NINE, Values.NINE),
+    ]
+    game.initialize_game(players[0])
+    for player in players[1:]:
+        game.add_player(player)
+    for player in players:
+        player.place_bet(101)
+    game._end_round()
+    assert [player.balance for player in players] == [899 + 152, 899 + 151, 899]
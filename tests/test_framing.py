@@ -0,0 +1,67 @@
+import socket
+
+import pytest
+
+from shared.network.framing import FRAME_HEADER, FrameDecoder, FrameTooLargeError, encode_frame
+
+
+def test_encode_frame_prefixes_length():
+    assert encode_frame(b"abc") == FRAME_HEADER.pack(3) + b"abc"
+    assert encode_frame(b"") == FRAME_HEADER.pack(0)
+
+
+def test_many_frames_in_one_read():
+    payloads = [b"one", b"", b"three" * 100]
+    decoder = FrameDecoder()
+    decoder.feed(b"".join(encode_frame(payload) for payload in payloads))
+    assert list(decoder.frames()) == payloads
+    assert decoder.start == decoder.end == 0
+
+
+def test_frame_split_over_single_bytes():
+    payloads = [b"hello", b"world" * 1000]
+    data = b"".join(encode_frame(payload) for payload in payloads)
+    decoder = FrameDecoder(buffer_size=16)
+    received = []
+    for i in range(len(data)):
+        decoder.feed(data[i:i + 1])
+        received.extend(decoder.frames())
+    assert received == payloads
+
+
+def test_recv_into_a_socket():
+    payloads = [b"a" * 5000, b"b"]
+    left, right = socket.socketpair()
+    with left, right:
+        right.sendall(b"".join(encode_frame(payload) for payload in payloads))
+        right.close()
+        decoder = FrameDecoder(buffer_size=64)
+        received = []
+        while decoder.recv_into(left, 1000):
+            received.extend(decoder.frames())
+    assert received == payloads
+
+
+def test_buffered_protocol_interface():
+    data = encode_frame(b"x" * 10000) + encode_frame(b"y")
+    decoder = FrameDecoder(buffer_size=64)
+    received = []
+    pos = 0
+    while pos < len(data):
+        view = decoder.get_buffer()
+        chunk = data[pos:pos + min(len(view), 3000)]
+        view[:len(chunk)] = chunk
+        view.release()
+        decoder.buffer_updated(len(chunk))
+        pos += len(chunk)
+        received.extend(decoder.frames())
+    assert received == [b"x" * 10000, b"y"]
+
+
+def test_frame_too_large():
+    with pytest.raises(FrameTooLargeError):
+        encode_frame(b"x" * 11, max_frame_size=10)
+    decoder = FrameDecoder(max_frame_size=10)
+    decoder.feed(FRAME_HEADER.pack(11))
+    with pytest.raises(FrameTooLargeError):
+        list(decoder.frames())
@@ -0,0 +1,46 @@
+import pytest
+
+from shared.network.inbound_queue import InboundQueue, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+
+
+def _drain(queue):
+    items = []
+    while queue:
+        items.append(queue.get())
+    return items
+
+
+def test_drop_oldest():
+    queue = InboundQueue(3, OVERFLOW_DROP_OLDEST)
+    for i in range(5):
+        assert queue.put(i)
+    assert _drain(queue) == [2, 3, 4]
+    assert queue.stats() == {"depth": 0, "peak_depth": 3, "dropped": 2}
+    assert queue.get() is None
+
+
+def test_drop_newest():
+    queue = InboundQueue(3, OVERFLOW_DROP_NEWEST)
+    assert [queue.put(i) for i in range(5)] == [True, True, True, False, False]
+    assert _drain(queue) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("overflow", [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST])
+def test_forced_items_survive_overflow_in_order(overflow):
+    queue = InboundQueue(256, overflow)
+    queue.put("chat 0")
+    queue.put("disconnected", force=True)
+    for i in range(1, 301):
+        queue.put(f"chat {i}")
+    items = _drain(queue)
+    assert "disconnected" in items
+    if overflow == OVERFLOW_DROP_NEWEST:
+        assert items[:2] == ["chat 0", "disconnected"]
+    else:
+        assert items[0] == "disconnected"
+    assert len(items) == 257
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        InboundQueue(overflow="drop_all")
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+import server.lobby_server as lobby_server
+from server.lobby_server import LobbyServer, _LobbyProtocol
+from shared.network.framing import FrameDecoder, encode_frame
+
+CLIENT = ("127.0.0.1", 40000)
+
+
+@pytest.fixture
+def lobby(capsys):
+    server = LobbyServer()
+    for i in range(30):
+        server._process_command("CREATE_ROOM", {
+            "host_name": f"host{i}",
+            "room_name": f"Mesa {i}",
+            "password": "segredo" if i % 3 == 0 else None
+        }, CLIENT)
+    return server
+
+
+def _pages(server, cursor=None, **request):
+    rooms = []
+    while True:
+        page = server._process_command("LIST_ROOMS", dict(request, cursor=cursor), CLIENT)
+        assert page["status"] == "success"
+        rooms.extend(page["rooms"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rooms
+
+
+def test_pages_cover_every_room_once(lobby):
+    rooms = _pages(lobby, limit=7)
+    ids = [room["room_id"] for room in rooms]
+    assert ids == sorted(lobby.rooms)
+    assert all("password" not in room for room in rooms)
+
+
+def test_unpaginated_list_is_unchanged(lobby):
+    response = lobby._process_command("LIST_ROOMS", {}, CLIENT)
+    assert "next_cursor" not in response
+    assert len(response["rooms"]) == 30
+
+
+def test_rooms_created_between_pages(lobby):
+    first = lobby._process_command("LIST_ROOMS", {"limit": 10}, CLIENT)
+    lobby._process_command("CREATE_ROOM", {"host_name": "late"}, CLIENT)
+    rest = _pages(lobby, limit=10, cursor=first["next_cursor"])
+    ids = [room["room_id"] for room in first["rooms"] + rest]
+    assert len(ids) == len(set(ids))
+    assert all(room_id > first["next_cursor"] for room_id in ids[10:])
+
+
+def test_filters(lobby):
+    locked = _pages(lobby, limit=4, filters={"has_password": True})
+    assert len(locked) == 10 and all(room["has_password"] for room in locked)
+    named = _pages(lobby, filters={"name": "MESA 2"})
+    assert sorted(room["room_name"] for room in named) == sorted(["Mesa 2"] + [f"Mesa {i}" for i in range(20, 30)])
+    lobby._process_command("JOIN_ROOM", {"room_id": named[0]["room_id"], "player_name": "x",
+                                         "password": "segredo"}, CLIENT)
+    assert len(_pages(lobby, filters={"max_players": 1})) == 29
+
+
+@pytest.mark.parametrize("request_data", [
+    {"limit": 0},
+    {"limit": "10"},
+    {"cursor": 5},
+    {"filters": ["name"]},
+    {"filters": {"color": "red"}},
+    {"filters": {"max_players": "2"}},
+])
+def test_invalid_page_requests(lobby, request_data):
+    assert lobby._process_command("LIST_ROOMS", request_data, CLIENT)["status"] == "error"
+
+
+class _Transport:
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def get_extra_info(self, name):
+        return CLIENT
+
+    def write(self, data):
+        self.data += data
+
+    def writelines(self, chunks):
+        self.data += b"".join(chunks)
+
+    def close(self):
+        self.closed = True
+
+    abort = close
+
+    def is_closing(self):
+        return self.closed
+
+
+@pytest.fixture
+def connect(lobby):
+    lobby.loop = asyncio.new_event_loop()
+
+    def connect():
+        protocol = _LobbyProtocol(lobby)
+        transport = _Transport()
+        protocol.connection_made(transport)
+        return protocol, transport
+
+    yield connect
+    lobby.loop.close()
+
+
+def test_legacy_response_size_limit(connect, monkeypatch):
+    protocol, transport = connect()
+    protocol.data_received(b'{"command": "LIST_ROOMS"}')
+    assert len(json.loads(transport.data)["rooms"]) == 30
+
+    monkeypatch.setattr(lobby_server, "MAX_RESPONSE_SIZE", 2000)
+    protocol, transport = connect()
+    protocol.data_received(b'{"command": "LIST_ROOMS"}')
+    assert json.loads(transport.data) == lobby_server.RESPONSE_TOO_LARGE_RESPONSE
+    assert transport.closed
+
+
+def test_framed_response_size_limit(connect, monkeypatch):
+    monkeypatch.setattr(lobby_server, "MAX_RESPONSE_SIZE", 2000)
+    protocol, transport = connect()
+    protocol.data_received(
+        encode_frame(b'{"command": "LIST_ROOMS", "id": 1}') +
+        encode_frame(b'{"command": "LIST_ROOMS", "id": 2, "limit": 3}')
+    )
+    decoder = FrameDecoder()
+    decoder.feed(transport.data)
+    first, second = [json.loads(payload) for payload in decoder.frames()]
+    assert first == dict(lobby_server.RESPONSE_TOO_LARGE_RESPONSE, id=1)
+    assert second["id"] == 2 and len(second["rooms"]) == 3
+    assert not transport.closed
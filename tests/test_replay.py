@@ -0,0 +1,68 @@
+import pytest
+
+from shared.game_logic.journal import EventJournal, JsonLinesSink
+from shared.game_logic.state_manager import GameState
+from shared.models.game import Game
+from shared.models.player import Player
+
+
+def _play(game, rounds=5):
+    game.initialize_game(Player("A", 1000, "a"))
+    game.add_player(Player("B", 1000, "b"))
+    game.add_player(Player("C", 1000, "c"))
+    limits = {"a": 15, "b": 17, "c": 18}
+    for round_number in range(rounds):
+        if round_number == 0:
+            game.start_game()
+        else:
+            game.start_new_round()
+        for player_id in limits:
+            game.place_bet(player_id, 100)
+        state_manager = game.state_manager
+        while state_manager.state == GameState.PLAYER_TURN:
+            player = state_manager.get_current_player()
+            if player.can_hit() and player.hand.get_value() < limits[player.player_id]:
+                game.hit(player.player_id)
+            else:
+                game.stand(player.player_id)
+    return game
+
+
+def _outcome(game):
+    state = game.get_game_state()
+    return [(p["id"], p["balance"], p["hand"]) for p in state["players"]], state["cards_remaining"]
+
+
+def test_same_seed_deals_the_same_game():
+    assert _outcome(_play(Game(seed=42))) == _outcome(_play(Game(seed=42)))
+    assert _outcome(_play(Game(seed=42))) != _outcome(_play(Game(seed=43)))
+
+
+def test_replay_reproduces_the_game():
+    game = _play(Game(seed=7))
+    record = game.get_replay()
+    assert record["complete"]
+    assert _outcome(Game.replay(record)) == _outcome(game)
+
+
+def test_replay_from_a_flushed_sink(tmp_path):
+    sink = JsonLinesSink(tmp_path / "journal.jsonl")
+    game = _play(Game(seed=9, journal=EventJournal(segment_size=8, max_segments=2, sink=sink)))
+    assert not game.get_replay()["complete"]
+    # Without the events still in memory the file is not the whole game
+    assert not game.get_replay(sink.load())["complete"]
+    with pytest.raises(ValueError):
+        Game.replay(game.get_replay(sink.load()))
+
+    game.journal.flush()
+    record = game.get_replay(sink.load())
+    assert record["complete"]
+    assert _outcome(Game.replay(record)) == _outcome(game)
+
+
+def test_cleared_messages_leave_the_state():
+    game = Game(seed=1)
+    game.messages.append("oi")
+    assert list(game.get_game_state()["messages"]) == ["oi"]
+    game.messages.clear()
+    assert list(game.get_game_state()["messages"]) == []
@@ -0,0 +1,73 @@
+import collections
+import random
+
+from shared.models.card import CARDS
+from shared.models.hand import Hand
+from shared.models.shoe import HI_LO, RANKS_PER_DECK, Shoe
+
+
+def _expected_counts(shoe):
+    counts = [0] * len(RANKS_PER_DECK)
+    for card in shoe.cards[shoe.cursor:]:
+        counts[card.points - 1] += 1
+    return counts
+
+
+def test_shoe_holds_every_card_num_decks_times():
+    shoe = Shoe(num_decks=6, rng=random.Random(1))
+    shoe.shuffle()
+    assert shoe.size == 312
+    assert sorted(card.code for card in shoe.cards) == sorted(card.code for card in CARDS * 6)
+    assert shoe.rank_counts == [count * 6 for count in RANKS_PER_DECK]
+
+
+def test_counts_follow_draws_and_returns():
+    rng = random.Random(2)
+    shoe = Shoe(num_decks=2, rng=rng)
+    shoe.shuffle()
+    running = 0
+    for _ in range(80):
+        card = shoe.draw()
+        running += HI_LO[card.points]
+        if rng.random() < 0.25:
+            shoe.return_card(card)
+            running -= HI_LO[card.points]
+        assert collections.Counter(shoe.cards) == collections.Counter(CARDS * 2)
+        assert shoe.rank_counts == _expected_counts(shoe)
+        assert shoe.running_count == running
+    assert shoe.cards_remaining() == shoe.size - shoe.cursor
+    assert abs(sum(shoe.next_card_distribution()) - 1) < 1e-9
+
+
+def test_draw_until_empty():
+    shoe = Shoe(rng=random.Random(3))
+    shoe.shuffle()
+    drawn = [shoe.draw() for _ in range(52)]
+    assert len(set(drawn)) == 52
+    assert shoe.draw() is None
+    assert shoe.cards_remaining() == 0
+    assert shoe.rank_counts == [0] * len(RANKS_PER_DECK)
+
+
+def test_cut_card():
+    shoe = Shoe(penetration=0.5, rng=random.Random(4))
+    shoe.shuffle()
+    for _ in range(25):
+        shoe.draw()
+    assert not shoe.needs_shuffle()
+    shoe.draw()
+    assert shoe.needs_shuffle()
+    assert Shoe().needs_shuffle(reserve=53)
+
+
+def test_bust_probability_matches_counting():
+    shoe = Shoe(rng=random.Random(5))
+    shoe.shuffle()
+    for _ in range(10):
+        shoe.draw()
+    hand = Hand()
+    hand.add_card(CARDS[9])  # Ten
+    hand.add_card(CARDS[4])  # Five
+    remaining = shoe.cards[shoe.cursor:]
+    busting = sum(1 for card in remaining if hand.hard_total + card.points > 21)
+    assert shoe.bust_probability(hand) == busting / len(remaining)
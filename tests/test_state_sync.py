@@ -0,0 +1,86 @@
+import copy
+import json
+
+import pytest
+
+from shared.models.game import Game
+from shared.models.player import Player
+from shared.network.message import MessageType
+from shared.network.state_sync import StateSync, apply_delta, compute_delta
+
+PAIRS = [
+    ({"a": 1, "b": 2}, {"a": 1, "b": 3}),
+    ({"a": 1, "b": 2}, {"a": 1}),
+    ({"a": 1}, {"a": 1, "c": {"x": [1, 2]}}),
+    ({"n": {"m": {"k": 1, "j": 2}}}, {"n": {"m": {"k": 1, "j": 5}}}),
+    ({"hand": [1, 2]}, {"hand": [1, 2, 3]}),
+    ({"log": ["a", "b", "c"]}, {"log": ["b", "c", "d"]}),
+    ({"players": [{"id": 1, "bet": 0}, {"id": 2, "bet": 0}]}, {"players": [{"id": 1, "bet": 5}, {"id": 2, "bet": 0}]}),
+    ({"l": [1, 2, 3]}, {"l": [3, 2]}),
+    ({"l": [1, "x"]}, {"l": [1, "y"]}),
+    ({"v": 1}, {"v": 1.0}),
+    ({"v": True}, {"v": 1}),
+]
+
+
+@pytest.mark.parametrize("old, new", PAIRS)
+def test_apply_delta_rebuilds_new_state(old, new):
+    patch = compute_delta(old, new)
+    assert apply_delta(copy.deepcopy(old), patch or {}) == new
+
+
+def test_equal_states_have_no_delta():
+    state = {"a": [1, {"b": 2}]}
+    assert compute_delta(state, copy.deepcopy(state)) is None
+
+
+def _wire(value):
+    """What a peer decodes from a JSON message"""
+    return json.loads(json.dumps(value))
+
+
+def _play(game):
+    """Yield the game state after every action of a short game"""
+    game.initialize_game(Player("A", 1000, "a"))
+    game.add_player(Player("B", 1000, "b"))
+    game.start_game()
+    yield game.get_game_state()
+    for player_id in ("a", "b"):
+        game.place_bet(player_id, 100)
+        yield game.get_game_state()
+    while game.state_manager.get_current_player() is not None and game.state_manager.state.name == "PLAYER_TURN":
+        player = game.state_manager.get_current_player()
+        if player.hand.get_value() < 17:
+            game.hit(player.player_id)
+        else:
+            game.stand(player.player_id)
+        yield game.get_game_state()
+
+
+def test_peer_follows_the_host_through_deltas():
+    sync = StateSync()
+    peer_state = None
+    kinds = []
+    for state in _play(Game(seed=5)):
+        for message, peers, _ in sync.messages_for(["p"], state, "host"):
+            assert peers == ["p"]
+            kinds.append(message.msg_type)
+            if message.msg_type == MessageType.GAME_STATE:
+                peer_state = _wire(message.content)
+            else:
+                content = _wire(message.content)
+                assert content["base"] == peer_state["version"]
+                apply_delta(peer_state, content["delta"])
+            sync.acknowledge("p", {"game_id": peer_state["game_id"], "version": peer_state["version"]})
+        assert peer_state == _wire(state)
+    assert kinds[0] == MessageType.GAME_STATE
+    assert set(kinds[1:]) == {MessageType.GAME_STATE_DELTA}
+
+
+def test_resync_sends_a_full_snapshot():
+    sync = StateSync()
+    states = _play(Game(seed=5))
+    sync.messages_for(["p"], next(states), "host")
+    sync.acknowledge("p", {"resync": True})
+    (message, _, _), = sync.messages_for(["p"], next(states), "host")
+    assert message.msg_type == MessageType.GAME_STATE